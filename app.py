@@ -19,6 +19,8 @@ from celery.result import AsyncResult
 from celery_app import celery
 import redis
 from config import REDIS_URL
+from processing.pipeline import json_dumps_wire
+from processing.tls import SSL_VERIFY
 
 # Configure logging
 logging.basicConfig(
@@ -197,10 +199,10 @@ def process_json():
 
                 external_response = req.put(
                     external_api_url,
-                    json=external_payload,
+                    data=json_dumps_wire(external_payload),
                     headers={'Content-Type': 'application/json'},
                     timeout=30,
-                    verify=False
+                    verify=SSL_VERIFY
                 )
 
                 if external_response.status_code == 200:
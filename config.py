@@ -20,6 +20,14 @@ VERTEX_MODEL_NAME = os.getenv('VERTEX_MODEL_NAME', 'gemini-2.5-pro')
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_ASSISTANT_ID = os.getenv('OPENAI_ASSISTANT_ID', '')
 
+# The worker pool is chosen on the command line (celery worker -P gevent), not here:
+# only the -P flag makes Celery monkey-patch before the app and its imports load.
+CELERY_WORKER_CONCURRENCY = int(os.getenv('CELERY_WORKER_CONCURRENCY', '0'))  # 0 = Celery default
+
+# With late acks a task is redelivered whenever its worker dies; after this many
+# deliveries process_data_task gives up instead of crashing workers in a loop
+TASK_MAX_DELIVERIES = int(os.getenv('TASK_MAX_DELIVERIES', '3'))
+
 # Celery Configuration
 CELERY_CONFIG = {
     'broker_url': REDIS_URL,
@@ -49,6 +57,11 @@ CELERY_CONFIG = {
     
     # Don't prefetch tasks for long-running workers
     'worker_prefetch_multiplier': 1,
+
+    # Ack only after the task finishes, and requeue it if the worker process dies,
+    # so a crash mid-pipeline redelivers the task instead of losing it
+    'task_acks_late': True,
+    'task_reject_on_worker_lost': True,
     
     # Keep results for 24 hours
     'result_expires': 86400,
@@ -67,5 +80,12 @@ CELERY_CONFIG = {
 
     # Worker settings for resilience
     'worker_cancel_long_running_tasks_on_connection_loss': False,
+
+    # Recycle prefork children so memory held by PDF rendering is returned to the OS
+    'worker_max_tasks_per_child': 20,
+    'worker_max_memory_per_child': 1500000,  # KiB (~1.5 GB), checked after each task
 }
 
+if CELERY_WORKER_CONCURRENCY:
+    CELERY_CONFIG['worker_concurrency'] = CELERY_WORKER_CONCURRENCY
+
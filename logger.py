@@ -4,6 +4,9 @@ Structured Logging with Task Context and Hourly File Rotation
 Provides per-task logging with unique task_id in every log message.
 Logs are written to both stdout and hourly rotating files.
 
+Records are handed to a background thread through a queue (QueueHandler /
+QueueListener), so logging calls never block on console or file I/O.
+
 Log files are stored in /app/logs/ (Docker) or ./logs/ (local)
 Each file represents a 1-hour time frame: app_2025-12-13_14.log
 
@@ -19,10 +22,12 @@ Output format:
     [2025-12-13 10:30:45] [INFO] [task_id=abc123] Starting OCR step
 """
 
+import atexit
 import logging
 import os
+import queue
 import sys
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 from datetime import datetime
 
 
@@ -134,12 +139,51 @@ class TaskLoggerAdapter(logging.LoggerAdapter):
         return f"[task_id={task_id}] {msg}", kwargs
 
 
+# Background thread writing queued records to the real handlers
+_queue_listener = None
+
+
+def _start_queue_listener(log_queue, handlers):
+    """Start a QueueListener draining log_queue into handlers (replacing any running one)."""
+    global _queue_listener
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def _restart_queue_listener_in_child():
+    """Threads don't survive fork, so forked workers (Celery prefork) need their own listener."""
+    if _queue_listener is None:
+        return
+
+    # Records still queued at fork time are the parent's to write
+    log_queue = _queue_listener.queue
+    while True:
+        try:
+            log_queue.get_nowait()
+        except queue.Empty:
+            break
+    _start_queue_listener(log_queue, _queue_listener.handlers)
+
+
+def shutdown_logging():
+    """Write out any queued records and stop the listener thread (runs at interpreter exit)."""
+    if _queue_listener is not None:
+        _queue_listener.stop()
+
+
+os.register_at_fork(after_in_child=_restart_queue_listener_in_child)
+atexit.register(shutdown_logging)
+
+
 def setup_logging():
     """
     Configure the root logger with:
     - Console output (stdout)
     - Hourly rotating file output
 
+    Both handlers run on a QueueListener thread; the root logger only has a
+    QueueHandler, so callers just enqueue the record.
+
     Log files are stored in LOG_DIR with format: app_YYYY-MM-DD_HH.log
     """
     # Create formatter with timestamp
@@ -155,22 +199,32 @@ def setup_logging():
     # Remove existing handlers to avoid duplicate logs
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
+    shutdown_logging()
 
     # Add stdout handler (for Docker logs / console)
     stdout_handler = logging.StreamHandler(sys.stdout)
     stdout_handler.setFormatter(formatter)
     stdout_handler.setLevel(logging.INFO)
-    root_logger.addHandler(stdout_handler)
+    handlers = [stdout_handler]
 
     # Add hourly rotating file handler
+    file_handler_error = None
     try:
         file_handler = HourlyRotatingFileHandler(LOG_DIR, prefix='app')
         file_handler.setFormatter(formatter)
         file_handler.setLevel(logging.INFO)
-        root_logger.addHandler(file_handler)
-        root_logger.info(f"Logging to directory: {LOG_DIR}")
+        handlers.append(file_handler)
     except Exception as e:
-        root_logger.warning(f"Could not setup file logging: {e}")
+        file_handler_error = e
+
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _start_queue_listener(log_queue, handlers)
+
+    if file_handler_error is None:
+        root_logger.info(f"Logging to directory: {LOG_DIR}")
+    else:
+        root_logger.warning(f"Could not setup file logging: {file_handler_error}")
 
     return root_logger
 
@@ -4,11 +4,23 @@ Reads evaluation JSON and places comments on the PDF at specified coordinates.
 Also draws red underlines from OCR data (Gemini output).
 """
 
+import logging
 import os
 import random
 import re
 import fitz  # PyMuPDF
 
+# Get logger for this module
+logger = logging.getLogger(__name__)
+
+# Font files ship alongside this module
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_PATRICK_PATH = os.path.join(_BASE_DIR, "PatrickHand-Regular.ttf")
+_NOTO_PATH = os.path.join(_BASE_DIR, "NotoSansDevanagari-Regular.ttf")
+
+# Private RNG instance for tick mark placement
+_rng = random.Random()
+
 
 def contains_devanagari(text: str) -> bool:
     """
@@ -22,15 +34,19 @@ def contains_devanagari(text: str) -> bool:
     return bool(devanagari_pattern.search(text))
 
 
-def get_font_for_text(text: str, base_dir: str) -> tuple:
+def get_font_for_text(text: str, base_dir: str = None) -> tuple:
     """
     Get the appropriate font based on text content.
     Returns (font_name, font_path) tuple.
 
     Uses Noto Sans Devanagari for Hindi text, PatrickHand for English.
     """
-    devanagari_font_path = os.path.join(base_dir, "NotoSansDevanagari-Regular.ttf")
-    patrickhand_font_path = os.path.join(base_dir, "PatrickHand-Regular.ttf")
+    if base_dir is None:
+        devanagari_font_path = _NOTO_PATH
+        patrickhand_font_path = _PATRICK_PATH
+    else:
+        devanagari_font_path = os.path.join(base_dir, "NotoSansDevanagari-Regular.ttf")
+        patrickhand_font_path = os.path.join(base_dir, "PatrickHand-Regular.ttf")
 
     if contains_devanagari(text):
         if os.path.exists(devanagari_font_path):
@@ -45,6 +61,79 @@ def get_font_for_text(text: str, base_dir: str) -> tuple:
             return ("helv", None)
 
 
+def wrap_and_measure(text: str, max_width: float, font, fontsize: float,
+                     line_spacing: float) -> tuple:
+    """
+    Greedily pack words into lines using real font metrics.
+
+    Args:
+        text: Text to wrap
+        max_width: Maximum line width in points
+        font: fitz.Font used to measure the text
+        fontsize: Font size in points
+        line_spacing: Distance between baselines in points
+
+    Returns:
+        Tuple of (list of lines, total height in points)
+    """
+    space_width = font.text_length(" ", fontsize=fontsize)
+    lines = []
+    current_line = ""
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = font.text_length(word, fontsize=fontsize)
+        if current_line and current_width + space_width + word_width <= max_width:
+            current_line += " " + word
+            current_width += space_width + word_width
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+            current_width = word_width
+
+    if current_line:
+        lines.append(current_line)
+
+    return lines, len(lines) * line_spacing
+
+
+def fill_wrapped_text(writer, rect, pos, text: str, font, fontsize: float,
+                      line_spacing: float) -> tuple:
+    """
+    Word-wrap text into a rectangle on a TextWriter using MuPDF's line breaking.
+
+    Wrapping happens in C against the real glyph metrics of the font, so
+    Devanagari text no longer relies on a fixed per-character width guess.
+    Lines that do not fit in the rectangle are dropped.
+
+    Args:
+        writer: fitz.TextWriter collecting text for the page
+        rect: Rectangle the text must fit in
+        pos: Baseline start point of the first line
+        text: Text to insert
+        font: fitz.Font to render with
+        fontsize: Font size in points
+        line_spacing: Distance between baselines in points
+
+    Returns:
+        Tuple of (baseline Y of the last written line, list of lines that did not fit)
+    """
+    overflow = writer.fill_textbox(
+        rect,
+        text,
+        pos=pos,
+        font=font,
+        fontsize=fontsize,
+        lineheight=line_spacing / fontsize,
+        align=fitz.TEXT_ALIGN_LEFT,
+        warn=None,  # never print to stdout or raise; overflow comes back and is logged below
+    )
+    if overflow:
+        logger.warning("[annotate_pdf] %d line(s) did not fit in the text box and were dropped", len(overflow))
+    return writer.last_point.y, overflow or []
+
+
 def draw_tick_mark(page, x: float, y: float, size: float = 12, color: tuple = (0, 0.6, 0), width: float = 2):
     """
     Draw a tick mark (checkmark ✓) at the specified position.
@@ -96,8 +185,7 @@ def draw_tick_marks_on_pages(doc, num_ticks_per_page: int = 4) -> int:
     tick_count = 0
     GREEN_COLOR = (0, 0.6, 0)  # Green color for tick marks
 
-    for page_num in range(len(doc)):
-        page = doc[page_num]
+    for page_num, page in enumerate(doc):
         page_width = page.rect.width
         page_height = page.rect.height
 
@@ -108,15 +196,18 @@ def draw_tick_marks_on_pages(doc, num_ticks_per_page: int = 4) -> int:
         safe_y_min = page_height * 0.10
         safe_y_max = page_height * 0.90
 
-        # Generate random positions for tick marks
-        for i in range(num_ticks_per_page):
-            x = random.uniform(safe_x_min, safe_x_max - 15)  # -15 for tick mark width
-            y = random.uniform(safe_y_min, safe_y_max)
+        # Generate random positions for all tick marks on the page in one batch
+        x_span = (safe_x_max - 15) - safe_x_min  # -15 for tick mark width
+        y_span = safe_y_max - safe_y_min
+        rand = _rng.random
+        xs = [safe_x_min + x_span * rand() for _ in range(num_ticks_per_page)]
+        ys = [safe_y_min + y_span * rand() for _ in range(num_ticks_per_page)]
 
+        for x, y in zip(xs, ys):
             draw_tick_mark(page, x, y, size=12, color=GREEN_COLOR, width=2)
             tick_count += 1
 
-        print(f"Drew {num_ticks_per_page} tick marks on page {page_num + 1}")
+        logger.debug("[annotate_pdf] Drew %d tick marks on page %d", num_ticks_per_page, page_num + 1)
 
     return tick_count
 
@@ -155,43 +246,42 @@ def draw_underlines_from_ocr(doc, ocr_data: dict, pages_metadata: list) -> int:
         page = doc[page_num]
         underlines = page_data.get("Underlines", [])
 
+        # Convert normalized coordinates to PDF points
+        # Check if we have metadata for this page
+        metadata = metadata_by_page.get(page_num + 1)  # 1-indexed
+
+        if metadata:
+            # Use metadata for proper conversion
+            # Normalized coords are 0-1, convert to page dimensions
+            sx = metadata.original_width_pt
+            sy = metadata.original_height_pt
+        else:
+            # Fallback to current page dimensions
+            sx = page.rect.width
+            sy = page.rect.height
+
+        # All underlines on the page share one shape and are committed together
+        shape = page.new_shape()
+        page_underlines = 0
+
         for underline in underlines:
             coords = underline.get("coordinates", [])
-            text = underline.get("text", "")
 
             if len(coords) != 4:
                 continue
 
             x1, y1, x2, y2 = coords
 
-            # Convert normalized coordinates to PDF points
-            # Check if we have metadata for this page
-            metadata = metadata_by_page.get(page_num + 1)  # 1-indexed
-
-            if metadata:
-                # Use metadata for proper conversion
-                # Normalized coords are 0-1, convert to page dimensions
-                page_width = metadata.original_width_pt
-                page_height = metadata.original_height_pt
-            else:
-                # Fallback to current page dimensions
-                page_width = page.rect.width
-                page_height = page.rect.height
+            # Draw red underline (horizontal line)
+            shape.draw_line(fitz.Point(x1 * sx, y2 * sy), fitz.Point(x2 * sx, y2 * sy))
 
-            # Convert normalized to points
-            x1_pt = x1 * page_width
-            y1_pt = y1 * page_height
-            x2_pt = x2 * page_width
-            y2_pt = y2 * page_height
+            page_underlines += 1
 
-            # Draw red underline (horizontal line)
-            shape = page.new_shape()
-            shape.draw_line(fitz.Point(x1_pt, y2_pt), fitz.Point(x2_pt, y2_pt))
+        if page_underlines:
             shape.finish(color=RED_COLOR, width=2)  # Bold red line
             shape.commit()
-
-            underline_count += 1
-            print(f"Drew underline for '{text}' on page {page_num + 1}")
+            underline_count += page_underlines
+            logger.debug("[annotate_pdf] Drew %d underlines on page %d", page_underlines, page_num + 1)
 
     return underline_count
 
@@ -234,13 +324,13 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
     RIGHT_MARGIN = int(RIGHT_MARGIN_INCHES * 72)  # 180 points
     BOTTOM_MARGIN = int(BOTTOM_MARGIN_INCHES * 72)  # 72 points
 
-    print(f"Adding {RIGHT_MARGIN_INCHES} inch right margin and {BOTTOM_MARGIN_INCHES} inch bottom margin...")
+    logger.debug("[annotate_pdf] Adding %s inch right margin and %s inch bottom margin",
+                 RIGHT_MARGIN_INCHES, BOTTOM_MARGIN_INCHES)
 
     # Create a new document to hold the modified pages
     new_doc = fitz.open()
 
-    for page_idx in range(len(doc)):
-        old_page = doc[page_idx]
+    for page_idx, old_page in enumerate(doc):
         old_rect = old_page.rect
         old_width = old_rect.width
         old_height = old_rect.height
@@ -251,12 +341,14 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
         # Create a new blank page with the expanded dimensions
         new_page = new_doc.new_page(width=new_width, height=new_height)
 
-        # Check if the page has any content (text, images, or drawings)
-        page_text = old_page.get_text().strip()
-        page_images = old_page.get_images()
-        page_drawings = old_page.get_drawings()
-
-        is_blank_page = len(page_text) == 0 and len(page_images) == 0 and len(page_drawings) == 0
+        # Check if the page has any content (images, text, or drawings).
+        # Cheapest check first: scanned answer sheets are almost always caught by
+        # get_images(), and get_drawings() only runs for pages with neither.
+        is_blank_page = not (
+            old_page.get_images(full=False)
+            or old_page.get_text("text", flags=0).strip()
+            or old_page.get_drawings()
+        )
 
         if not is_blank_page:
             # Place original content at top-left, leaving bottom margin empty
@@ -264,23 +356,24 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
             try:
                 new_page.show_pdf_page(target_rect, doc, page_idx)
             except Exception as e:
-                print(f"Warning: Could not copy page {page_idx}: {e}")
+                logger.warning("[annotate_pdf] Could not copy page %d: %s", page_idx, e)
 
-    # Close original doc and save new_doc to a temp location, then reopen
+    # Close original doc and round-trip new_doc through memory, then reopen.
+    # No temp file is involved, so nothing can leak if a later step raises.
     doc.close()
 
-    # Save to a temp file first, then we'll add annotations and save to output_path
-    import tempfile
-    temp_fd, temp_path = tempfile.mkstemp(suffix='.pdf')
-    os.close(temp_fd)
-
-    new_doc.save(temp_path)
+    new_pdf_bytes = new_doc.tobytes()
     new_doc.close()
 
-    # Reopen the saved document for adding annotations
-    doc = fitz.open(temp_path)
+    # Reopen the serialized document for adding annotations
+    doc = fitz.open("pdf", new_pdf_bytes)
+    del new_pdf_bytes
+
+    # Page dimensions are fixed from here on; look them up once instead of per annotation
+    page_dims = {i: (p.rect.width, p.rect.height) for i, p in enumerate(doc)}
 
-    print(f"Added {RIGHT_MARGIN} points ({RIGHT_MARGIN_INCHES} inches) right margin and {BOTTOM_MARGIN} points ({BOTTOM_MARGIN_INCHES} inch) bottom margin to all pages.")
+    logger.debug("[annotate_pdf] Added %d pt right margin and %d pt bottom margin to all pages",
+                 RIGHT_MARGIN, BOTTOM_MARGIN)
 
     # ===========================================
     # STEP 1: Draw RED underlines from OCR data (DISABLED)
@@ -288,18 +381,18 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
     underline_count = 0
     # DISABLED: Underline drawing removed per user request
     # if ocr_data:
-    #     print("Drawing red underlines from Gemini OCR data...")
+    #     logger.debug("[annotate_pdf] Drawing red underlines from Gemini OCR data")
     #     underline_count = draw_underlines_from_ocr(doc, ocr_data, pages_metadata)
-    #     print(f"Drew {underline_count} red underlines.")
+    #     logger.debug("[annotate_pdf] Drew %d red underlines", underline_count)
 
     # ===========================================
     # STEP 2: Draw GREEN tick marks at random positions (DISABLED)
     # ===========================================
     tick_count = 0
     # DISABLED: Tick marks removed per user request
-    # print("Drawing tick marks on each page...")
+    # logger.debug("[annotate_pdf] Drawing tick marks on each page")
     # tick_count = draw_tick_marks_on_pages(doc, num_ticks_per_page=4)
-    # print(f"Drew {tick_count} tick marks total.")
+    # logger.debug("[annotate_pdf] Drew %d tick marks total", tick_count)
 
     # ===========================================
     # STEP 3: Add text annotations from evaluation
@@ -309,11 +402,28 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
 
     annotation_count = 0
 
-    # Load Patrick Hand font for scores
-    font_path = os.path.join(os.path.dirname(__file__), "PatrickHand-Regular.ttf")
+    # Load each font file once and reuse the handle for every line of text
+    patrick_font = fitz.Font(fontfile=_PATRICK_PATH) if os.path.exists(_PATRICK_PATH) else fitz.Font("helv")
+    noto_font = fitz.Font(fontfile=_NOTO_PATH) if os.path.exists(_NOTO_PATH) else fitz.Font("helv")
+
+    def font_for_text(text):
+        # Same selection as get_font_for_text(), but returns the preloaded handle
+        return noto_font if contains_devanagari(text) else patrick_font
+
+    # Text is collected per (page, color) and written once per page at the end,
+    # so each page gets a single text object instead of one per line
+    writers = {}
+
+    def get_writer(page_idx, color):
+        key = (page_idx, color)
+        if key not in writers:
+            page_width, page_height = page_dims[page_idx]
+            writers[key] = fitz.TextWriter(fitz.Rect(0, 0, page_width, page_height))
+        return writers[key]
 
     # Process each question
     questions = evaluation.get("Questions", {})
+    pending_comments = []
 
     for q_id, q_data in questions.items():
         # ===========================================
@@ -355,22 +465,20 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
                     text_x = score_x - text_width / 2
                     text_y = score_y + font_size / 3
 
-                    page.insert_text(
+                    get_writer(score_page_num, RED_COLOR).append(
                         fitz.Point(text_x, text_y),
                         score_text,
-                        fontsize=font_size,
-                        color=RED_COLOR,
-                        fontname="patrickhand",
-                        fontfile=font_path
+                        font=patrick_font,
+                        fontsize=font_size
                     )
 
-                    print(f"Added score {score} for {q_id} on page {score_page_num + 1}")
+                    logger.debug("[annotate_pdf] Added score %s for %s on page %d", score, q_id, score_page_num + 1)
             except (ValueError, TypeError) as e:
-                print(f"Warning: Could not add score for {q_id}: {e}")
+                logger.warning("[annotate_pdf] Could not add score for %s: %s", q_id, e)
 
         comments = q_data.get("Comments", {})
 
-        # Process Introduction, Body, Conclusion
+        # Collect Introduction, Body, Conclusion comments; they are drawn page by page below
         for section in ["Introduction", "Body", "Conclusion"]:
             section_comments = comments.get(section, [])
 
@@ -383,89 +491,58 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
                     continue
 
                 if page_num < 0 or page_num >= len(doc):
-                    print(f"Warning: Page {page_num + 1} out of range for {q_id} {section}")
+                    logger.warning("[annotate_pdf] Page %d out of range for %s %s", page_num + 1, q_id, section)
                     continue
 
-                page = doc[page_num]
-                x1, y1, x2, y2 = coordinates
+                pending_comments.append((page_num, coordinates[1], q_id, section, comment_text))
 
-                # Create a comment box in the right margin
-                box_width = 170
-                chars_per_line = int(box_width / 9)  # Adjusted for larger font
-                num_lines = max(1, len(comment_text) // chars_per_line + 1)
-                box_height = num_lines * 20 + 15  # Adjusted for larger line spacing
+    # Draw comments grouped by page (then top to bottom) so each page is visited contiguously
+    pending_comments.sort(key=lambda c: (c[0], c[1]))
 
-                # Position the comment box in the right margin
-                page_width = page.rect.width
-                page_height = page.rect.height
+    current_page_num = None
+    for page_num, y1, q_id, section, comment_text in pending_comments:
+        if page_num != current_page_num:
+            current_page_num = page_num
+            page_width, page_height = page_dims[page_num]
+            original_page_width = page_width - RIGHT_MARGIN
+            writer = get_writer(page_num, RED_COLOR)
 
-                original_page_width = page_width - RIGHT_MARGIN
-                box_x1 = original_page_width + 5
-                box_y1 = y1
-                box_x2 = box_x1 + box_width
-                box_y2 = y1 + box_height
+        # Get appropriate font for this comment text (Hindi or English)
+        comment_font = font_for_text(comment_text)
 
-                # Ensure box fits within page height
-                if box_y2 > page_height - 5:
-                    box_y1 = max(5, page_height - box_height - 5)
-                    box_y2 = box_y1 + box_height
+        # Create a comment box in the right margin, sized from the measured wrap
+        box_width = 170
+        lines, text_height = wrap_and_measure(comment_text, box_width - 10, comment_font, 16, 20)
+        box_height = max(20, text_height) + 15
 
-                # Create the comment box rectangle
-                comment_rect = fitz.Rect(box_x1, box_y1, box_x2, box_y2)
+        # Position the comment box in the right margin
+        box_x1 = original_page_width + 5
+        box_y1 = y1
+        box_y2 = y1 + box_height
 
-                # No box drawn - transparent background, no border
+        # Ensure box fits within page height
+        if box_y2 > page_height - 5:
+            box_y1 = max(5, page_height - box_height - 5)
+            box_y2 = box_y1 + box_height
 
-                # Get appropriate font for this comment text (Hindi or English)
-                base_dir = os.path.dirname(__file__)
-                comment_font_name, comment_font_path = get_font_for_text(comment_text, base_dir)
+        # No box drawn - transparent background, no border
 
-                # Wrap text manually
-                words = comment_text.split()
-                lines = []
-                current_line = ""
+        # Insert the pre-wrapped lines inside the box
+        y_offset = box_y1 + 20
+        for line in lines:
+            if y_offset + 10 >= max(box_y2, page_height):
+                logger.warning("[annotate_pdf] Comment for %s %s truncated on page %d",
+                               q_id, section, page_num + 1)
+                break
+            writer.append(fitz.Point(box_x1 + 5, y_offset), line, font=comment_font, fontsize=16)
+            y_offset += 20
 
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    if len(test_line) * 9 < box_width - 10:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-
-                if current_line:
-                    lines.append(current_line)
-
-                # Insert each line with appropriate font
-                y_offset = box_y1 + 20
-                for line in lines:
-                    if y_offset + 10 < box_y2:
-                        if comment_font_path:
-                            page.insert_text(
-                                fitz.Point(box_x1 + 5, y_offset),
-                                line,
-                                fontsize=16,
-                                color=RED_COLOR,
-                                fontname=comment_font_name,
-                                fontfile=comment_font_path
-                            )
-                        else:
-                            page.insert_text(
-                                fitz.Point(box_x1 + 5, y_offset),
-                                line,
-                                fontsize=16,
-                                color=RED_COLOR,
-                                fontname=comment_font_name
-                            )
-                        y_offset += 20
-
-                annotation_count += 1
-                print(f"Added: {q_id} {section} on page {page_num + 1}")
+        annotation_count += 1
+        logger.debug("[annotate_pdf] Added: %s %s on page %d", q_id, section, page_num + 1)
 
     # ===========================================
     # STEP 4: Add Summary at bottom of each question's last page
     # ===========================================
-    base_dir = os.path.dirname(__file__)
     SUMMARY_COLOR = (0.8, 0, 0)  # Red color for summary (changed from blue)
     summary_count = 0
 
@@ -486,12 +563,10 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
         if page_num < 0 or page_num >= len(doc):
             continue
 
-        page = doc[page_num]
-        page_height = page.rect.height
-        page_width = page.rect.width
+        page_width, page_height = page_dims[page_num]
 
         # Get appropriate font for this summary text (Hindi or English)
-        summary_font_name, summary_font_path = get_font_for_text(summary_text, base_dir)
+        summary_font = font_for_text(summary_text)
 
         # Position summary at bottom of page (avoiding bottom 5% margin)
         summary_y = page_height - 60  # 60 points from bottom
@@ -499,47 +574,13 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
 
         # Wrap and add summary text (no label prefix)
         max_width = page_width - 100  # Leave margins
-        words = summary_text.split()
-        lines = []
-        current_line = ""
-
-        for word in words:
-            test_line = current_line + " " + word if current_line else word
-            if len(test_line) * 8 < max_width:  # Adjusted for larger font
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = word
-
-        if current_line:
-            lines.append(current_line)
-
-        # Insert summary lines with appropriate font
-        y_offset = summary_y  # Start at summary position (no label above)
-        for line in lines:
-            if y_offset < page_height - 10:
-                if summary_font_path:
-                    page.insert_text(
-                        fitz.Point(summary_x + 10, y_offset),
-                        line,
-                        fontsize=15,
-                        color=SUMMARY_COLOR,
-                        fontname=summary_font_name,
-                        fontfile=summary_font_path
-                    )
-                else:
-                    page.insert_text(
-                        fitz.Point(summary_x + 10, y_offset),
-                        line,
-                        fontsize=15,
-                        color=SUMMARY_COLOR,
-                        fontname=summary_font_name
-                    )
-                y_offset += 18  # Increased line spacing
+        text_rect = fitz.Rect(summary_x + 10, summary_y - 15, summary_x + 10 + max_width, page_height - 5)
+        fill_wrapped_text(get_writer(page_num, SUMMARY_COLOR), text_rect,
+                          fitz.Point(summary_x + 10, summary_y), summary_text,
+                          summary_font, 15, 18)
 
         summary_count += 1
-        print(f"Added summary for {q_id} on page {page_num + 1}")
+        logger.debug("[annotate_pdf] Added summary for %s on page %d", q_id, page_num + 1)
 
     # ===========================================
     # STEP 5: Add OverallSummary on the designated summary page
@@ -553,11 +594,10 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
 
         if 0 <= summary_page_idx < len(doc):
             summary_page = doc[summary_page_idx]
-            print(f"Adding Overall Summary on page {summary_page_position}")
+            logger.debug("[annotate_pdf] Adding Overall Summary on page %d", summary_page_position)
 
             # Get page dimensions
-            current_page_height = summary_page.rect.height
-            current_page_width = summary_page.rect.width
+            current_page_width, current_page_height = page_dims[summary_page_idx]
 
             # Original dimensions (before margins were added)
             original_page_height = current_page_height - BOTTOM_MARGIN  # Remove bottom margin
@@ -567,23 +607,21 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
                 # Case 1: Existing page with some content (>50% empty)
                 # Start at top 20% of the page, NO title
                 title_y = original_page_height * 0.20  # Top 20% of the original page area
-                print(f"  Case 1: Placing at top 20% of page (starting at: {title_y:.1f}), no title")
+                logger.debug("[annotate_pdf] Case 1: Placing at top 20%% of page (starting at: %.1f), no title", title_y)
 
                 # For Case 1, skip the title and start bullet points directly
                 y_offset = title_y
             else:
                 # Case 2: Blank page inserted at position 1, place at the top with title
                 title_y = 60
-                print(f"  Case 2: Placing at top of blank page (title at: {title_y})")
+                logger.debug("[annotate_pdf] Case 2: Placing at top of blank page (title at: %s)", title_y)
 
                 # Add title for Case 2 only
-                summary_page.insert_text(
+                get_writer(summary_page_idx, (0.1, 0.1, 0.5)).append(  # Dark blue
                     fitz.Point(50, title_y),
                     "Overall Summary & Recommendations",
-                    fontsize=22,
-                    color=(0.1, 0.1, 0.5),  # Dark blue
-                    fontname="patrickhand",
-                    fontfile=font_path
+                    font=patrick_font,
+                    fontsize=22
                 )
 
                 # Draw a line under title
@@ -597,7 +635,6 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
 
             # Add bullet points
             bullet_color = (0.2, 0.2, 0.2)  # Dark gray for text
-            base_dir = os.path.dirname(__file__)
 
             for i, item in enumerate(overall_summary, 1):
                 # Draw bullet point (filled circle)
@@ -610,76 +647,47 @@ def annotate_pdf_with_comments(pdf_path: str, evaluation: dict, output_path: str
                 shape.commit()
 
                 # Get appropriate font for this bullet item (Hindi or English)
-                bullet_font_name, bullet_font_path = get_font_for_text(item, base_dir)
+                bullet_font = font_for_text(item)
 
-                # Wrap text for bullet point
+                # Wrap and insert bullet text with appropriate font
                 max_width = 480
-                words = item.split()
-                lines = []
-                current_line = ""
-
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    if len(test_line) * 8 < max_width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-
-                if current_line:
-                    lines.append(current_line)
-
-                # Insert bullet text with appropriate font
-                for j, line in enumerate(lines):
-                    text_x = bullet_x + 15 if j == 0 else bullet_x + 15
-                    if bullet_font_path:
-                        summary_page.insert_text(
-                            fitz.Point(text_x, y_offset),
-                            line,
-                            fontsize=14,
-                            color=bullet_color,
-                            fontname=bullet_font_name,
-                            fontfile=bullet_font_path
-                        )
-                    else:
-                        summary_page.insert_text(
-                            fitz.Point(text_x, y_offset),
-                            line,
-                            fontsize=14,
-                            color=bullet_color,
-                            fontname=bullet_font_name
-                        )
-                    y_offset += 20
-
+                text_x = bullet_x + 15
+                text_rect = fitz.Rect(text_x, y_offset - 14, text_x + max_width, current_page_height - 5)
+                last_y, overflow = fill_wrapped_text(get_writer(summary_page_idx, bullet_color), text_rect,
+                                                     fitz.Point(text_x, y_offset), item,
+                                                     bullet_font, 14, 20)
+                if overflow:
+                    logger.warning("[annotate_pdf] Overall Summary bullet %d truncated on page %d", i, summary_page_position)
+                    break
+
+                y_offset = last_y + 20
                 y_offset += 15  # Extra space between bullet points
 
-            print(f"Added {len(overall_summary)} bullet points to Overall Summary on page {summary_page_position}")
+            logger.debug("[annotate_pdf] Added %d bullet points to Overall Summary on page %d",
+                         len(overall_summary), summary_page_position)
             overall_summary_added = True
         else:
-            print(f"Warning: Summary page position {summary_page_position} is out of range (total pages: {len(doc)})")
+            logger.warning("[annotate_pdf] Summary page position %d is out of range (total pages: %d)",
+                           summary_page_position, len(doc))
     elif overall_summary:
-        print("Warning: OverallSummary exists but no summary_page_position specified - skipping Overall Summary")
-
-    # Save the annotated PDF to the final output path
-    doc.save(output_path, garbage=4, deflate=True)
+        logger.warning("[annotate_pdf] OverallSummary exists but no summary_page_position specified - skipping Overall Summary")
+
+    # Flush collected text: one write per page and color
+    for (page_idx, color), writer in sorted(writers.items(), key=lambda item: item[0][0]):
+        writer.write_text(doc[page_idx], color=color)
+
+    # Save the annotated PDF to the final output path.
+    # The document was rebuilt from scratch above, so a light garbage pass is
+    # enough; garbage=4 (duplicate stream detection) costs far more than it saves.
+    # Scanned answer sheets are already JPEG/Flate-compressed, so image streams
+    # are left as they are rather than run through zlib again.
+    doc.save(output_path, garbage=1, deflate=True, deflate_images=False, deflate_fonts=True, clean=False)
     doc.close()
 
-    # Clean up temp file
-    try:
-        if 'temp_path' in dir() and os.path.exists(temp_path):
-            os.remove(temp_path)
-    except:
-        pass
-
-    print(f"\n{'=' * 60}")
-    print(f"✅ Annotated PDF saved to: {output_path}")
-    print(f"📝 Total annotations added: {annotation_count}")
-    print(f"📍 Total underlines drawn: {underline_count}")
-    print(f"✓ Total tick marks drawn: {tick_count}")
-    print(f"📋 Total summaries added: {summary_count}")
-    print(f"📄 Overall Summary: {'Added on page ' + str(summary_page_position) if overall_summary_added else 'N/A'}")
-    print("=" * 60)
+    logger.info("[annotate_pdf] Annotated PDF saved to: %s (annotations: %d, underlines: %d, ticks: %d, "
+                "summaries: %d, overall summary: %s)",
+                output_path, annotation_count, underline_count, tick_count, summary_count,
+                f"page {summary_page_position}" if overall_summary_added else "N/A")
 
     return output_path
 
@@ -5,16 +5,23 @@ Handles uploading files to DigitalOcean Spaces and generating public URLs.
 Includes PDF compression to save storage space.
 """
 
+import base64
+import hashlib
+import io
+import mmap
 import os
 import logging
 import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
-import urllib3
 import fitz  # PyMuPDF
 
-# Disable SSL warnings (for environments with certificate issues)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+from . import process_pool
+from .tls import SSL_VERIFY
 
 logger = logging.getLogger(__name__)
 
@@ -25,25 +32,88 @@ DO_SPACES_REGION = os.environ.get('DO_SPACES_REGION', 'sfo3')
 DO_SPACES_BUCKET = os.environ.get('DO_SPACES_BUCKET', '')
 DO_SPACES_ENDPOINT = os.environ.get('DO_SPACES_ENDPOINT', f'https://{DO_SPACES_REGION}.digitaloceanspaces.com')
 
-
-def compress_pdf(input_path: str, output_path: str = None) -> str:
+# Set to '1' when the bucket has a public-read bucket policy (s3:GetObject for "*").
+# Objects are then uploaded without a per-object ACL header.
+DO_SPACES_USE_BUCKET_POLICY = os.environ.get('DO_SPACES_USE_BUCKET_POLICY', '0') == '1'
+
+# Whether all required credentials are present (checked once at import)
+_CONFIGURED = bool(DO_SPACES_KEY) and bool(DO_SPACES_SECRET) and bool(DO_SPACES_BUCKET)
+
+# Public URL prefix for uploaded objects
+# Format: https://{bucket}.{region}.digitaloceanspaces.com/{key}
+_URL_PREFIX = f"https://{DO_SPACES_BUCKET}.{DO_SPACES_REGION}.digitaloceanspaces.com/"
+
+# HTTP connection pool size for the shared client.
+# Must be >= the number of threads uploading concurrently, or extra threads
+# pay a fresh TLS handshake per request ("Connection pool is full").
+DO_SPACES_MAX_POOL = int(os.environ.get('DO_SPACES_MAX_POOL', '50'))
+
+# PDFs smaller than this (bytes) are uploaded as-is; compression rarely pays off
+DO_SPACES_COMPRESS_MIN = int(os.environ.get('DO_SPACES_COMPRESS_MIN', '204800'))
+
+# Compressed output must be at least 5% smaller than the original to be used
+COMPRESS_MIN_RATIO = 0.95
+
+# PyMuPDF save options per compression preset, selected with DO_SPACES_COMPRESS_LEVEL.
+# garbage=4 (stream deduplication) and linear=True (linearization pass) cost 2x+ CPU
+# for typically <2% smaller output, so they are reserved for 'max'.
+COMPRESS_LEVELS = {
+    'fast': {'garbage': 1, 'deflate': True, 'clean': False, 'linear': False},
+    'balanced': {'garbage': 3, 'deflate': True, 'clean': False, 'linear': False},
+    'max': {'garbage': 4, 'deflate': True, 'clean': True, 'linear': True},
+}
+DO_SPACES_COMPRESS_LEVEL = os.environ.get('DO_SPACES_COMPRESS_LEVEL', 'balanced')
+
+# Files above the threshold are split into parts and uploaded in parallel
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True,
+)
+
+
+def _compress_options(compress_level: str = None) -> dict:
+    """Resolve a compression preset name (default from DO_SPACES_COMPRESS_LEVEL) to save options."""
+    level = compress_level or DO_SPACES_COMPRESS_LEVEL
+    if level not in COMPRESS_LEVELS:
+        logger.warning("[do_spaces] Unknown compress level '%s', using 'balanced'", level)
+        level = 'balanced'
+    return COMPRESS_LEVELS[level]
+
+
+def compress_pdf(input_path: str, output_path: str = None, garbage: int = 3, clean: bool = False,
+                 linear: bool = False, deflate: bool = True) -> str:
     """
     Compress a PDF file to reduce file size.
 
     Args:
         input_path: Path to the input PDF file
         output_path: Path for the compressed PDF (default: temp file)
+        garbage: PyMuPDF garbage collection level (default: 3; 4 also deduplicates streams)
+        clean: Whether to clean content streams (default: False)
+        linear: Whether to linearize for fast web view (default: False)
+        deflate: Whether to compress streams (default: True)
 
     Returns:
         Path to the compressed PDF file
     """
     try:
         original_size = os.path.getsize(input_path)
+        if original_size < DO_SPACES_COMPRESS_MIN:
+            logger.info("[do_spaces] Skipping compression for small PDF: %s (%.2f KB)",
+                       input_path, original_size / 1024)
+            return input_path
+
         logger.info("[do_spaces] Compressing PDF: %s (original size: %.2f KB)", 
                    input_path, original_size / 1024)
 
         # Open the PDF
         doc = fitz.open(input_path)
+        if doc.is_fast_webaccess:
+            logger.info("[do_spaces] PDF is already linearized, skipping compression: %s", input_path)
+            doc.close()
+            return input_path
 
         # Create output path if not provided
         if output_path is None:
@@ -51,19 +121,22 @@ def compress_pdf(input_path: str, output_path: str = None) -> str:
             os.close(fd)
 
         # Save with compression options
-        # garbage=4: maximum garbage collection (removes unused objects)
-        # deflate=True: compress streams
-        # clean=True: clean content streams
         doc.save(
             output_path,
-            garbage=4,      # Maximum garbage collection
-            deflate=True,   # Compress streams
-            clean=True,     # Clean content streams
-            linear=True,    # Linearize for web (fast web view)
+            garbage=garbage,
+            deflate=deflate,
+            clean=clean,
+            linear=linear,
         )
         doc.close()
 
         compressed_size = os.path.getsize(output_path)
+        if compressed_size >= original_size * COMPRESS_MIN_RATIO:
+            logger.info("[do_spaces] Compression saved too little (%.2f KB -> %.2f KB), using original file",
+                       original_size / 1024, compressed_size / 1024)
+            os.remove(output_path)
+            return input_path
+
         reduction = ((original_size - compressed_size) / original_size) * 100 if original_size > 0 else 0
 
         logger.info("[do_spaces] ✅ PDF compressed: %.2f KB -> %.2f KB (%.1f%% reduction)",
@@ -76,9 +149,13 @@ def compress_pdf(input_path: str, output_path: str = None) -> str:
         return input_path
 
 
-def get_spaces_client():
+@lru_cache(maxsize=1)
+def _client():
     """
-    Create and return a boto3 client for DigitalOcean Spaces.
+    Create the shared boto3 client for DigitalOcean Spaces.
+
+    The client is built once per process and reused; boto3 clients are
+    thread-safe, so concurrent uploads share its connection pool.
 
     Returns:
         boto3 client configured for DO Spaces
@@ -89,67 +166,207 @@ def get_spaces_client():
         endpoint_url=DO_SPACES_ENDPOINT,
         aws_access_key_id=DO_SPACES_KEY,
         aws_secret_access_key=DO_SPACES_SECRET,
-        config=Config(signature_version='s3v4'),
-        verify=False  # Disable SSL verification for environments with cert issues
+        config=Config(
+            signature_version='s3v4',
+            max_pool_connections=DO_SPACES_MAX_POOL,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive', 'max_attempts': 5},
+        ),
+        verify=SSL_VERIFY
     )
     return client
 
 
-def upload_to_spaces(file_path: str, destination_path: str = None, content_type: str = 'application/pdf', compress: bool = True) -> dict:
+def compress_pdf_bytes(input_path: str, compress_level: str = None) -> bytes:
     """
-    Upload a file to DigitalOcean Spaces.
+    Compress a PDF file in memory.
 
     Args:
-        file_path: Local path to the file to upload
-        destination_path: Path/key in the bucket (default: uses filename)
-        content_type: MIME type of the file (default: application/pdf)
-        compress: Whether to compress PDF files before upload (default: True)
+        input_path: Path to the input PDF file
+        compress_level: Preset from COMPRESS_LEVELS ('fast', 'balanced', 'max');
+                        defaults to DO_SPACES_COMPRESS_LEVEL
 
     Returns:
-        Dictionary with status, public_url, and message
+        Compressed PDF bytes, or None if the original file should be uploaded as-is
+        (too small, already linearized, no meaningful saving, or compression failed)
     """
-    if not all([DO_SPACES_KEY, DO_SPACES_SECRET, DO_SPACES_BUCKET]):
-        logger.error("[do_spaces] Missing DO Spaces configuration")
-        return {
-            'status': 'error',
-            'message': 'DigitalOcean Spaces not configured. Missing environment variables.',
-            'public_url': None
-        }
+    try:
+        original_size = os.path.getsize(input_path)
+        if original_size < DO_SPACES_COMPRESS_MIN:
+            logger.info("[do_spaces] Skipping compression for small PDF: %s (%.2f KB)",
+                       input_path, original_size / 1024)
+            return None
+
+        logger.info("[do_spaces] Compressing PDF: %s (original size: %.2f KB)",
+                   input_path, original_size / 1024)
+
+        doc = fitz.open(input_path)
+        try:
+            if doc.is_fast_webaccess:
+                logger.info("[do_spaces] PDF is already linearized, skipping compression: %s", input_path)
+                return None
+            data = doc.tobytes(**_compress_options(compress_level))
+        finally:
+            doc.close()
+
+        compressed_size = len(data)
+        if compressed_size >= original_size * COMPRESS_MIN_RATIO:
+            logger.info("[do_spaces] Compression saved too little (%.2f KB -> %.2f KB), using original file",
+                       original_size / 1024, compressed_size / 1024)
+            return None
+
+        reduction = ((original_size - compressed_size) / original_size) * 100 if original_size > 0 else 0
+
+        logger.info("[do_spaces] ✅ PDF compressed: %.2f KB -> %.2f KB (%.1f%% reduction)",
+                   original_size / 1024, compressed_size / 1024, reduction)
+
+        return data
+
+    except Exception as e:
+        logger.warning("[do_spaces] Failed to compress PDF: %s. Using original file.", str(e))
+        return None
+
+
+def get_spaces_client():
+    """
+    Return the shared boto3 client for DigitalOcean Spaces.
+
+    Returns:
+        boto3 client configured for DO Spaces
+    """
+    return _client()
+
+
+def close_client():
+    """
+    Drop the cached Spaces client (e.g. after credentials rotate).
+
+    The next call to get_spaces_client() builds a fresh client.
+    """
+    _client.cache_clear()
+
+
+# Uploads already done by this process: (destination_path, sha256) -> public URL
+_UPLOAD_CACHE = {}
+_UPLOAD_CACHE_LOCK = threading.Lock()
 
-    compressed_path = None
-    upload_path = file_path
 
+def _file_sha256(file_path: str) -> str:
+    """
+    Hash a file's contents via mmap (no userspace read buffer).
+
+    Returns:
+        Hex SHA-256 digest, or None if the file could not be hashed
+    """
     try:
-        # Use filename if no destination path provided
-        if destination_path is None:
-            destination_path = os.path.basename(file_path)
+        with open(file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return hashlib.sha256(b'').hexdigest()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+    except (OSError, ValueError) as e:
+        logger.debug("[do_spaces] Could not hash %s: %s", file_path, e)
+        return None
 
-        # Compress PDF if enabled and file is a PDF
-        if compress and content_type == 'application/pdf' and file_path.lower().endswith('.pdf'):
-            compressed_path = compress_pdf(file_path)
-            if compressed_path != file_path:
-                upload_path = compressed_path
 
-        logger.info("[do_spaces] Uploading file to DO Spaces: %s -> %s", upload_path, destination_path)
+def _cached_upload(destination_path: str, digest: str) -> dict:
+    """Return a success result if identical content was already uploaded to destination_path."""
+    if digest is None:
+        return None
 
-        client = get_spaces_client()
+    with _UPLOAD_CACHE_LOCK:
+        public_url = _UPLOAD_CACHE.get((destination_path, digest))
 
-        # Upload the file with public-read ACL
-        with open(upload_path, 'rb') as file_data:
+    if public_url is None:
+        return None
+
+    logger.info("[do_spaces] Identical file already uploaded, skipping: %s", public_url)
+    return {
+        'status': 'success',
+        'message': 'File already uploaded',
+        'public_url': public_url
+    }
+
+
+def _forget_uploads(file_keys) -> None:
+    """Drop cached uploads for deleted keys."""
+    keys = set(file_keys)
+    with _UPLOAD_CACHE_LOCK:
+        for cache_key in [k for k in _UPLOAD_CACHE if k[0] in keys]:
+            del _UPLOAD_CACHE[cache_key]
+
+
+def _wants_compression(file_path: str, content_type: str, compress: bool) -> bool:
+    """Whether a file should be compressed before upload."""
+    return compress and content_type == 'application/pdf' and file_path.lower().endswith('.pdf')
+
+
+def _upload_prepared(file_path: str, destination_path: str, content_type: str, compressed_data: bytes,
+                     digest: str = None) -> dict:
+    """
+    Upload a file (or its already-compressed bytes) to DigitalOcean Spaces.
+
+    Args:
+        file_path: Local path to the original file
+        destination_path: Path/key in the bucket
+        content_type: MIME type of the file
+        compressed_data: Compressed PDF bytes, or None to upload file_path as-is
+        digest: SHA-256 of the original file, recorded in the upload cache on success
+
+    Returns:
+        Dictionary with status, public_url, and message
+    """
+    try:
+        logger.info("[do_spaces] Uploading file to DO Spaces: %s -> %s", file_path, destination_path)
+
+        client = _client()
+        extra_args = {'ContentType': content_type}
+        if not DO_SPACES_USE_BUCKET_POLICY:
+            extra_args['ACL'] = 'public-read'
+
+        # Upload publicly readable (multipart for large files); the compressed
+        # variant is streamed straight from memory without touching disk
+        if compressed_data is not None and len(compressed_data) < TRANSFER_CONFIG.multipart_threshold:
+            # Single-part body already in memory: hash it once here and send Content-MD5
+            # so Spaces verifies integrity without botocore re-reading the body.
+            # (upload_fileobj does not accept ContentMD5, hence put_object.)
+            content_md5 = base64.b64encode(hashlib.md5(compressed_data, usedforsecurity=False).digest()).decode()
             client.put_object(
                 Bucket=DO_SPACES_BUCKET,
                 Key=destination_path,
-                Body=file_data,
-                ACL='public-read',
-                ContentType=content_type
+                Body=compressed_data,
+                ContentMD5=content_md5,
+                **extra_args
+            )
+        elif compressed_data is not None:
+            client.upload_fileobj(
+                io.BytesIO(compressed_data),
+                DO_SPACES_BUCKET,
+                destination_path,
+                ExtraArgs=extra_args,
+                Config=TRANSFER_CONFIG
+            )
+        else:
+            # upload_file lets s3transfer open the path itself: multipart parts are
+            # read straight from disk by each upload thread instead of being
+            # buffered from one shared file object
+            client.upload_file(
+                file_path,
+                DO_SPACES_BUCKET,
+                destination_path,
+                ExtraArgs=extra_args,
+                Config=TRANSFER_CONFIG
             )
 
         # Generate public URL
-        # Format: https://{bucket}.{region}.digitaloceanspaces.com/{key}
-        public_url = f"https://{DO_SPACES_BUCKET}.{DO_SPACES_REGION}.digitaloceanspaces.com/{destination_path}"
+        public_url = _URL_PREFIX + destination_path
 
         logger.info("[do_spaces] File uploaded successfully. Public URL: %s", public_url)
 
+        if digest is not None:
+            with _UPLOAD_CACHE_LOCK:
+                _UPLOAD_CACHE[(destination_path, digest)] = public_url
+
         return {
             'status': 'success',
             'message': 'File uploaded successfully',
@@ -164,14 +381,137 @@ def upload_to_spaces(file_path: str, destination_path: str = None, content_type:
             'public_url': None
         }
 
-    finally:
-        # Clean up compressed temp file if it was created
-        if compressed_path and compressed_path != file_path:
+
+def upload_to_spaces(file_path: str, destination_path: str = None, content_type: str = 'application/pdf',
+                     compress: bool = True, compress_level: str = None) -> dict:
+    """
+    Upload a file to DigitalOcean Spaces.
+
+    Args:
+        file_path: Local path to the file to upload
+        destination_path: Path/key in the bucket (default: uses filename)
+        content_type: MIME type of the file (default: application/pdf)
+        compress: Whether to compress PDF files before upload (default: True)
+        compress_level: Compression preset ('fast', 'balanced', 'max'); pass 'max' when
+                        archival size matters (default: DO_SPACES_COMPRESS_LEVEL)
+
+    Returns:
+        Dictionary with status, public_url, and message
+    """
+    if not _CONFIGURED:
+        logger.error("[do_spaces] Missing DO Spaces configuration")
+        return {
+            'status': 'error',
+            'message': 'DigitalOcean Spaces not configured. Missing environment variables.',
+            'public_url': None
+        }
+
+    # Use filename if no destination path provided
+    if destination_path is None:
+        destination_path = os.path.basename(file_path)
+
+    # Skip the upload entirely if this exact content already went to this key
+    digest = _file_sha256(file_path)
+    cached = _cached_upload(destination_path, digest)
+    if cached is not None:
+        return cached
+
+    # Compress PDF in memory if enabled and file is a PDF (CPU-bound, so in a worker process)
+    compressed_data = None
+    if _wants_compression(file_path, content_type, compress):
+        try:
+            compressed_data = process_pool.run_in_process(compress_pdf_bytes, file_path, compress_level)
+        except Exception as e:
+            logger.warning("[do_spaces] Failed to compress PDF: %s. Using original file.", str(e))
+
+    return _upload_prepared(file_path, destination_path, content_type, compressed_data, digest)
+
+
+def upload_many_to_spaces(items: list, max_workers: int = 16) -> list:
+    """
+    Upload several files to DigitalOcean Spaces concurrently.
+
+    All compressions are submitted to the shared process pool first, so they run
+    in parallel across cores while the upload threads overlap network transfers.
+    All threads share the cached client, so keep max_workers <= DO_SPACES_MAX_POOL.
+
+    Args:
+        items: List of argument tuples for upload_to_spaces, e.g.
+               [(file_path, destination_path), ...]
+        max_workers: Maximum number of concurrent uploads (default: 16)
+
+    Returns:
+        List of result dictionaries from upload_to_spaces, in the same order as items
+    """
+    if not items:
+        return []
+
+    if not _CONFIGURED:
+        logger.error("[do_spaces] Missing DO Spaces configuration")
+        return [{
+            'status': 'error',
+            'message': 'DigitalOcean Spaces not configured. Missing environment variables.',
+            'public_url': None
+        } for _ in items]
+
+    # Positional defaults of upload_to_spaces, used to pad short argument tuples
+    defaults = (None, None, 'application/pdf', True, None)
+
+    results = {}
+    jobs = {}
+    for idx, args in enumerate(items):
+        file_path, destination_path, content_type, compress, compress_level = tuple(args) + defaults[len(args):]
+        if destination_path is None:
+            destination_path = os.path.basename(file_path)
+
+        digest = _file_sha256(file_path)
+        cached = _cached_upload(destination_path, digest)
+        if cached is not None:
+            results[idx] = cached
+            continue
+
+        # Start compression now; None means compress inline (or not at all)
+        future = None
+        wants_compression = _wants_compression(file_path, content_type, compress)
+        if wants_compression:
+            future = process_pool.submit(compress_pdf_bytes, file_path, compress_level)
+        jobs[idx] = (file_path, destination_path, content_type, compress_level, wants_compression, future, digest)
+
+    if not jobs:
+        return [results[idx] for idx in range(len(items))]
+
+    def run_job(job):
+        file_path, destination_path, content_type, compress_level, wants_compression, future, digest = job
+        compressed_data = None
+        if wants_compression:
             try:
-                os.remove(compressed_path)
-                logger.debug("[do_spaces] Cleaned up compressed temp file: %s", compressed_path)
-            except:
-                pass
+                if future is not None:
+                    compressed_data = future.result()
+                else:
+                    compressed_data = compress_pdf_bytes(file_path, compress_level)
+            except Exception as e:
+                logger.warning("[do_spaces] Failed to compress PDF: %s. Using original file.", str(e))
+        return _upload_prepared(file_path, destination_path, content_type, compressed_data, digest)
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        upload_futures = {}
+
+        # Jobs without a pending compression go straight to the upload threads
+        for idx, job in jobs.items():
+            if job[5] is None:
+                upload_futures[idx] = executor.submit(run_job, job)
+
+        # The rest start uploading as soon as their own compression finishes,
+        # so one file's upload overlaps the next file's compression
+        pending = {job[5]: idx for idx, job in jobs.items() if job[5] is not None}
+        for future in as_completed(pending):
+            idx = pending[future]
+            upload_futures[idx] = executor.submit(run_job, jobs[idx])
+
+        for idx, upload_future in upload_futures.items():
+            results[idx] = upload_future.result()
+
+    return [results[idx] for idx in range(len(items))]
 
 
 def delete_from_spaces(file_key: str) -> dict:
@@ -184,16 +524,17 @@ def delete_from_spaces(file_key: str) -> dict:
     Returns:
         Dictionary with status and message
     """
-    if not all([DO_SPACES_KEY, DO_SPACES_SECRET, DO_SPACES_BUCKET]):
+    if not _CONFIGURED:
         return {
             'status': 'error',
             'message': 'DigitalOcean Spaces not configured'
         }
 
     try:
-        client = get_spaces_client()
+        client = _client()
         client.delete_object(Bucket=DO_SPACES_BUCKET, Key=file_key)
 
+        _forget_uploads([file_key])
         logger.info("[do_spaces] File deleted: %s", file_key)
 
         return {
@@ -208,3 +549,53 @@ def delete_from_spaces(file_key: str) -> dict:
             'message': f'Failed to delete from DO Spaces: {str(e)}'
         }
 
+
+
+def delete_many_from_spaces(file_keys: list) -> dict:
+    """
+    Delete several files from DigitalOcean Spaces in batched requests.
+
+    Keys are sent with delete_objects in groups of up to 1000 (the S3 limit),
+    so N deletions cost ceil(N / 1000) requests instead of N.
+
+    Args:
+        file_keys: Keys/paths of the files in the bucket
+
+    Returns:
+        Dictionary with status, message, and the list of keys that failed to delete
+    """
+    if not _CONFIGURED:
+        return {
+            'status': 'error',
+            'message': 'DigitalOcean Spaces not configured',
+            'failed': list(file_keys)
+        }
+
+    failed = []
+    try:
+        client = _client()
+        _forget_uploads(file_keys)
+        for start in range(0, len(file_keys), 1000):
+            chunk = file_keys[start:start + 1000]
+            response = client.delete_objects(
+                Bucket=DO_SPACES_BUCKET,
+                Delete={'Objects': [{'Key': key} for key in chunk], 'Quiet': True}
+            )
+            # Quiet mode only reports the keys that failed
+            failed.extend(err.get('Key') for err in response.get('Errors', []))
+
+        logger.info("[do_spaces] Deleted %d files (%d failed)", len(file_keys) - len(failed), len(failed))
+
+        return {
+            'status': 'success' if not failed else 'error',
+            'message': 'Files deleted successfully' if not failed else f'Failed to delete {len(failed)} files',
+            'failed': failed
+        }
+
+    except Exception as e:
+        logger.error("[do_spaces] Failed to delete files: %s", str(e))
+        return {
+            'status': 'error',
+            'message': f'Failed to delete from DO Spaces: {str(e)}',
+            'failed': list(file_keys)
+        }
@@ -7,27 +7,116 @@ Provides two main functions:
 """
 
 import base64
+import functools
+import gzip
+import hashlib
+import inspect
 import json
 import logging
 import os
+import random
 import re
+import tempfile
 import time
 import requests
-import urllib3
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
-from dataclasses import dataclass
-from typing import Dict, Any, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, replace
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Union
 
 import fitz  # PyMuPDF
 
-# Suppress SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+from . import process_pool
+from .tls import SSL_VERIFY
 
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+if orjson is not None:
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch the same type
+    _json_loads = orjson.loads
+
+    def _json_dumps_pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+else:
+    _json_loads = json.loads
+
+    def _json_dumps_pretty(obj) -> str:
+        return json.dumps(obj, indent=2, ensure_ascii=False)
+
+
+# Precompiled patterns for sanitize_json_string
+_NUM_WORD_RE = re.compile(r'(\d+)\s+[a-zA-Z]+\s*,')
+_WORD_IN_ARRAY_RE = re.compile(r',\s*[a-zA-Z_]+\s*,')
+_COORDS_RE = re.compile(r'"(Coordinates|coordinates)":\s*\[\s*([^\]]+)\]', re.DOTALL)
+
+# Letters (ASCII or Devanagari) inside a Coordinates array: the hallucination sanitize_json_string repairs
+_HALLUC_RE = re.compile(r'"[Cc]oordinates"\s*:\s*\[[^\]]*[A-Za-z\u0900-\u097F]')
+
+
+_NUMBER_CHARS = frozenset('0123456789.-')
+
+# Memoize the pure JSON clean-up helpers so retries on the same text don't redo
+# the work. Set to False to disable (e.g. when profiling shows no repeats).
+USE_CACHE = True
+_MEMO_CACHE_SIZE = 128
+
+
+def _memoize(fn):
+    """Bounded lru_cache on fn when USE_CACHE is on; fn unchanged otherwise."""
+    return lru_cache(maxsize=_MEMO_CACHE_SIZE)(fn) if USE_CACHE else fn
+
+
+def _extract_up_to_4_floats(body: str) -> List[str]:
+    """
+    Pull coordinate numbers out of a (possibly corrupted) array body in one pass.
+
+    Walks the characters once, collecting runs of [-0-9.]. The first run in each
+    comma-separated part that parses as a float is kept; words, Devanagari text
+    and stray punctuation are skipped. Stops after 4 numbers.
+
+    Args:
+        body: Text between the array brackets
 
+    Returns:
+        Exactly 4 number strings, padded with "0.0" if fewer were found
+    """
+    numbers = []
+    buf = []
+    part_has_number = False
+
+    for ch in body + ',':
+        if ch in _NUMBER_CHARS:
+            buf.append(ch)
+            continue
+
+        if buf:
+            if not part_has_number:
+                try:
+                    numbers.append(str(float(''.join(buf))))
+                    part_has_number = True
+                except ValueError:
+                    pass
+                if len(numbers) == 4:
+                    return numbers
+            buf = []
+
+        if ch == ',':
+            part_has_number = False
+
+    while len(numbers) < 4:
+        numbers.append('0.0')
+    return numbers
+
+
+@_memoize
 def sanitize_json_string(json_str: str) -> str:
     """
     Sanitize JSON string to fix common Gemini hallucination errors.
@@ -40,11 +129,11 @@ def sanitize_json_string(json_str: str) -> str:
     """
     # Pattern 1: Replace "number word" patterns with just "number.0"
     # e.g., "0 astounding" -> "0.0"
-    json_str = re.sub(r'(\d+)\s+[a-zA-Z]+\s*,', r'\1.0,', json_str)
+    json_str = _NUM_WORD_RE.sub(r'\1.0,', json_str)
 
     # Pattern 2: Remove standalone ASCII words in arrays
     # e.g., [0.12, word, 0.34] -> [0.12, 0.0, 0.34]
-    json_str = re.sub(r',\s*[a-zA-Z_]+\s*,', ', 0.0,', json_str)
+    json_str = _WORD_IN_ARRAY_RE.sub(', 0.0,', json_str)
 
     # Pattern 3: Fix coordinate arrays with text/Hindi content inserted
     # This handles cases like:
@@ -53,57 +142,38 @@ def sanitize_json_string(json_str: str) -> str:
 
     # Find all "Coordinates": [...] or "coordinates": [...] blocks and validate them
     def fix_coordinates_array(match):
-        full_match = match.group(0)
         key = match.group(1)  # "Coordinates" or "coordinates"
         content = match.group(2)  # The array content
 
-        # Split by comma and filter to keep only valid numbers
-        parts = content.split(',')
-        cleaned_parts = []
-
-        for part in parts:
-            part = part.strip()
-            # Check if it's a valid number (integer or decimal)
-            if re.match(r'^-?\d+\.?\d*$', part):
-                cleaned_parts.append(part)
-            elif re.match(r'^-?\d+\.\d*$', part.split()[0] if part.split() else ''):
-                # Handle "0.627\n text" - take just the number
-                num_match = re.match(r'^(-?\d+\.?\d*)', part)
-                if num_match:
-                    cleaned_parts.append(num_match.group(1))
-                else:
-                    cleaned_parts.append('0.0')
-            else:
-                # Try to extract any number from the part
-                num_match = re.search(r'(-?\d+\.?\d*)', part)
-                if num_match and len(num_match.group(1)) > 0:
-                    cleaned_parts.append(num_match.group(1))
-                # Skip non-numeric parts entirely
-
-        # Ensure we have exactly 4 coordinates, pad with 0.0 if needed
-        while len(cleaned_parts) < 4:
-            cleaned_parts.append('0.0')
-        cleaned_parts = cleaned_parts[:4]  # Take only first 4
+        # Keep the first valid number from each comma-separated part, padded/truncated to 4
+        cleaned_parts = _extract_up_to_4_floats(content)
 
         return f'"{key}": [{", ".join(cleaned_parts)}]'
 
     # Apply coordinate array fix - match multiline coordinate arrays
-    json_str = re.sub(
-        r'"(Coordinates|coordinates)":\s*\[\s*([^\]]+)\]',
-        fix_coordinates_array,
-        json_str,
-        flags=re.MULTILINE | re.DOTALL
-    )
+    json_str = _COORDS_RE.sub(fix_coordinates_array, json_str)
 
     return json_str
 
 
-def safe_json_loads(json_str: str) -> dict:
+def _needs_sanitizing(json_str: str) -> bool:
+    """Cheap check for the Gemini hallucination patterns sanitize_json_string can repair."""
+    return bool(
+        _HALLUC_RE.search(json_str)
+        or _NUM_WORD_RE.search(json_str)
+        or _WORD_IN_ARRAY_RE.search(json_str)
+    )
+
+
+def safe_json_loads(json_str) -> dict:
     """
     Safely parse JSON string with sanitization fallback.
 
+    The sanitizer only runs after a parse failure, and only when the input
+    shows one of the hallucination patterns it knows how to fix.
+
     Args:
-        json_str: JSON string to parse
+        json_str: JSON string (or UTF-8 bytes) to parse
 
     Returns:
         Parsed dictionary
@@ -112,28 +182,83 @@ def safe_json_loads(json_str: str) -> dict:
         json.JSONDecodeError if parsing fails even after sanitization
     """
     try:
-        return json.loads(json_str)
+        return _json_loads(json_str)
     except json.JSONDecodeError as e:
         logger.warning("Initial JSON parse failed: %s", e)
+
+        if isinstance(json_str, (bytes, bytearray)):
+            json_str = json_str.decode("utf-8", errors="replace")
+
+        if not _needs_sanitizing(json_str):
+            logger.error("JSON parse failed and no known hallucination pattern found; not sanitizing")
+            raise
+
         logger.warning("Attempting to sanitize JSON...")
 
         # Try sanitizing and parsing again
         sanitized = sanitize_json_string(json_str)
         try:
-            result = json.loads(sanitized)
+            result = _json_loads(sanitized)
             logger.info("Successfully parsed sanitized JSON")
             return result
         except json.JSONDecodeError as e2:
             logger.error("JSON parse failed even after sanitization: %s", e2)
             raise
 
+# Page image encodings accepted by Gemini: format -> MIME type
+IMAGE_MIME_TYPES = {
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+}
+JPEG_QUALITY = 90
+
+# OpenAI Assistant run polling (seconds); initial delay can be tuned via env
+POLL_INITIAL_DELAY = float(os.environ.get('OPENAI_POLL_INITIAL_DELAY', '0.5'))
+POLL_BACKOFF_FACTOR = 1.5
+POLL_MAX_DELAY = 5.0
+POLL_JITTER = 0.25
+
+# On-disk cache of OCR results, keyed by a hash of the inputs. Off unless
+# DEEP_EVAL_CACHE=1; DEEP_EVAL_CACHE_DIR moves it, and at most
+# DEEP_EVAL_CACHE_MAX_FILES entries are kept (least recently used go first).
+RESULT_CACHE_ENABLED = os.environ.get('DEEP_EVAL_CACHE', '0').lower() in ('1', 'true', 'yes')
+RESULT_CACHE_DIR = os.environ.get('DEEP_EVAL_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'deep-eval'))
+RESULT_CACHE_MAX_FILES = int(os.environ.get('DEEP_EVAL_CACHE_MAX_FILES', '500'))
+
+# Backoff for rate-limit / quota errors on POSTs (the sessions don't retry those)
+RATE_LIMIT_ATTEMPTS = 3
+RATE_LIMIT_MAX_DELAY = 60
+VERTEX_RATE_LIMIT_MARKERS = ("RESOURCE_EXHAUSTED", "quota")
+OPENAI_RATE_LIMIT_MARKERS = ("rate_limit_exceeded",)
+
+# Long PDFs are OCR'd as concurrent requests of this many pages each
+# (DEEP_EVAL_OCR_CHUNK_PAGES=0 sends the whole document in one request)
+OCR_CHUNK_PAGES = int(os.environ.get('DEEP_EVAL_OCR_CHUNK_PAGES', '8'))
+OCR_CHUNK_WORKERS = 4
+
+# Gemini OCR prompt; read once per process unless DEEP_EVAL_RELOAD_PROMPT=1 (for prompt development)
+_PROMPT_PATH = os.path.join(os.path.dirname(__file__), "gemini-prompt.txt")
+RELOAD_PROMPT = os.environ.get('DEEP_EVAL_RELOAD_PROMPT', '0').lower() in ('1', 'true', 'yes')
+
 # A4 dimensions in points (72 points = 1 inch)
 A4_WIDTH_PT = 595.0   # 210mm
 A4_HEIGHT_PT = 842.0  # 297mm
 
+# US Letter in points; rendered as-is like A4 pages
+LETTER_WIDTH_PT = 612.0
+LETTER_HEIGHT_PT = 792.0
+
 
-def create_retry_session(retries=5, backoff_factor=2, status_forcelist=(500, 502, 503, 504)):
-    """Create a requests session with retry logic."""
+def create_retry_session(retries=5, backoff_factor=2, status_forcelist=(500, 502, 503, 504),
+                         pool_connections=10, pool_maxsize=10, allowed_methods=Retry.DEFAULT_ALLOWED_METHODS):
+    """
+    Create a requests session with retry logic.
+
+    Idempotent methods (allowed_methods) are retried on connection errors, read
+    errors and status_forcelist responses, raising once retries run out. POST is
+    only retried on connection errors; rate limits on POSTs are handled (once)
+    by _post_with_rate_limit.
+    """
     session = requests.Session()
     retry = Retry(
         total=retries,
@@ -141,18 +266,209 @@ def create_retry_session(retries=5, backoff_factor=2, status_forcelist=(500, 502
         connect=retries,
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
+        allowed_methods=frozenset(allowed_methods),
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
 
 
-@dataclass
+@lru_cache(maxsize=None)
+def _get_session(host_key: str) -> requests.Session:
+    """
+    Return the shared retry session for an API host ("vertex" or "openai").
+
+    Sessions live for the whole process, so repeated calls (and the OpenAI poll
+    loop) reuse warm keep-alive connections instead of a TLS handshake per call.
+    The pool is sized so concurrent evaluators share connections.
+    """
+    return create_retry_session(retries=3, backoff_factor=2, pool_connections=8, pool_maxsize=32)
+
+
+@lru_cache(maxsize=1)
+def _load_prompt() -> str:
+    with open(_PROMPT_PATH, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _get_prompt() -> str:
+    """Return the Gemini OCR prompt text (cached after the first read)."""
+    if RELOAD_PROMPT:
+        _load_prompt.cache_clear()
+    return _load_prompt()
+
+
+def _new_hasher():
+    """Hasher for cache keys: BLAKE2b is faster than SHA-256 on large PDFs without SHA extensions."""
+    return hashlib.blake2b(digest_size=32)
+
+
+def _hash_file(hasher, file_path: str, chunk_size: int = 1 << 20):
+    """Feed a file into hasher in chunks, without reading it all into memory."""
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            hasher.update(chunk)
+
+
+def _hash_parts(*parts) -> str:
+    """Hash several values; each part is length-prefixed so boundaries can't collide."""
+    hasher = _new_hasher()
+    for part in parts:
+        data = str(part).encode("utf-8")
+        hasher.update(len(data).to_bytes(8, "big"))
+        hasher.update(data)
+    return hasher.hexdigest()
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(RESULT_CACHE_DIR, key[:2], key + ".json.gz")
+
+
+def _cache_load(key: str):
+    """Return the cached value for key, or None on a miss (or unreadable entry)."""
+    path = _cache_path(key)
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            value = json.load(f)
+        os.utime(path)  # mark as recently used for pruning
+        return value
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable cache entry %s: %s", key, e)
+        return None
+
+
+def _cache_store(key: str, value) -> None:
+    """Write value to the cache atomically; failures are logged and otherwise ignored."""
+    path = _cache_path(key)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as f:
+                f.write(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not write cache entry %s: %s", key, e)
+        return
+
+    _cache_prune()
+
+
+def _cache_prune() -> None:
+    """Keep at most RESULT_CACHE_MAX_FILES entries, dropping the least recently used."""
+    try:
+        entries = []
+        for subdir in os.scandir(RESULT_CACHE_DIR):
+            if subdir.is_dir():
+                entries.extend(e for e in os.scandir(subdir.path) if e.name.endswith(".json.gz"))
+        if len(entries) <= RESULT_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - RESULT_CACHE_MAX_FILES]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+    except OSError as e:
+        logger.warning("Could not prune result cache: %s", e)
+
+
+def _cached(key_fn, encode=None, decode=None):
+    """
+    Memoize a DocumentProcessor method on disk.
+
+    The wrapped method gains a use_cache=True keyword argument.
+
+    Args:
+        key_fn: Called as key_fn(self, arguments) with the bound arguments dict
+                (defaults applied); returns the cache key
+        encode: Converts a result to a JSON-serializable value, or None to skip caching it
+        decode: Converts a cached value back into a result
+
+    Returns:
+        Decorator
+    """
+    def decorator(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, use_cache: bool = True, **kwargs):
+            key = None
+            if use_cache and RESULT_CACHE_ENABLED:
+                bound = signature.bind(self, *args, **kwargs)
+                bound.apply_defaults()
+                key = key_fn(self, bound.arguments)
+
+                cached = _cache_load(key)
+                if cached is not None:
+                    logger.info("Cache hit for %s (%s)", method.__name__, key[:12])
+                    return decode(cached) if decode else cached
+
+            result = method(self, *args, **kwargs)
+
+            if key is not None:
+                value = encode(result) if encode else result
+                if value is not None:
+                    _cache_store(key, value)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _is_rate_limited(response: requests.Response, markers: Tuple[str, ...]) -> bool:
+    """True for a 429, or an error body carrying one of the provider's quota markers."""
+    if response.status_code == 429:
+        return True
+    if response.ok:
+        return False
+    body = response.text
+    return any(marker in body for marker in markers)
+
+
+def _post_with_rate_limit(session: requests.Session, url: str, markers: Tuple[str, ...],
+                          attempts: int = RATE_LIMIT_ATTEMPTS, **kwargs) -> requests.Response:
+    """
+    POST, backing off and retrying while the provider reports a rate limit / exhausted quota.
+
+    This is the only retry layer for rate limits: the sessions never retry a
+    POST on its response status, so the wait stays bounded by attempts.
+
+    Args:
+        session: Session to post with
+        url: Request URL
+        markers: Substrings of the error body that identify a rate-limit error
+        attempts: Extra attempts after the first rate-limited response
+        **kwargs: Passed to session.post
+
+    Returns:
+        The last response (possibly still rate-limited)
+    """
+    response = session.post(url, **kwargs)
+    for attempt in range(1, attempts + 1):
+        if not _is_rate_limited(response, markers):
+            break
+        delay = min(RATE_LIMIT_MAX_DELAY, 2 ** attempt) + random.uniform(0, 1)
+        logger.warning("Rate limited (HTTP %d); retrying in %.1fs (attempt %d/%d)",
+                       response.status_code, delay, attempt, attempts)
+        time.sleep(delay)
+        response = session.post(url, **kwargs)
+    return response
+
+
+@dataclass(frozen=True, slots=True)
 class PageMetadata:
     """
     Stores metadata about a page's original dimensions and transformation.
     Used for converting normalized coordinates back to original PDF coordinates.
+    Immutable (and hashable) so per-page transforms can be cached.
     """
     page_number: int  # 1-indexed
     original_width_pt: float  # Original page width in points
@@ -166,6 +482,301 @@ class PageMetadata:
     dpi: int  # DPI used for image conversion
 
 
+def _build_generate_content_body(prompt: str, images: List[bytes], mime_type: str,
+                                 generation_config: Dict[str, Any]) -> bytes:
+    """
+    Serialize a Vertex AI generateContent request body straight to bytes.
+
+    Only the small parts (prompt, config) go through json.dumps. Each page image
+    is base64-encoded (bytes, never a str) and appended to the body in place, so
+    only one page's base64 copy is alive at a time, and the JSON encoder never
+    walks tens of MB of image data.
+
+    Args:
+        prompt: Prompt text
+        images: Raw encoded page images (PNG or JPEG bytes)
+        mime_type: MIME type of the images
+        generation_config: generationConfig object
+
+    Returns:
+        UTF-8 encoded JSON request body
+    """
+    image_prefix = b',{"inline_data":{"mime_type":' + json.dumps(mime_type).encode() + b',"data":"'
+    body = bytearray(b'{"contents":[{"role":"user","parts":[{"text":')
+    body += json.dumps(prompt).encode("utf-8")
+    body += b'}'
+    for image in images:
+        body += image_prefix
+        body += base64.b64encode(image)
+        body += b'"}}'
+    body += b']}],"generationConfig":'
+    body += json.dumps(generation_config).encode("utf-8")
+    body += b'}'
+    return bytes(body)
+
+
+@lru_cache(maxsize=1024)
+def _page_affine(metadata: PageMetadata) -> Tuple[float, float, float, float]:
+    """
+    Collapse the normalized -> PDF-point conversion for a page into x' = x*ax + bx, y' = y*ay + by.
+
+    Equivalent to the step-by-step math in DocumentProcessor.normalized_to_pdf_coords
+    (normalized -> image pixels -> A4 points -> remove padding -> undo scale).
+
+    Returns:
+        Tuple of (ax, bx, ay, by)
+    """
+    px_to_pt = 72.0 / metadata.dpi
+    ax = metadata.image_width_px * px_to_pt
+    ay = metadata.image_height_px * px_to_pt
+    bx = by = 0.0
+
+    if metadata.was_converted:
+        ax /= metadata.scale
+        ay /= metadata.scale
+        bx = -metadata.x_offset_pt / metadata.scale
+        by = -metadata.y_offset_pt / metadata.scale
+
+    return ax, bx, ay, by
+
+
+def _needs_a4_conversion(page_width: float, page_height: float, tolerance: float = 1.0) -> bool:
+    """
+    Decide whether a page has to be fitted onto an A4 canvas before rendering.
+
+    A4 and US Letter pages, in either orientation, render at the size the OCR
+    step expects as they are; everything else (other paper sizes, scans,
+    photos, receipts) goes through the A4 fitter.
+
+    Args:
+        page_width: Page width in points
+        page_height: Page height in points
+        tolerance: Allowed deviation in points from the A4 / Letter dimensions
+
+    Returns:
+        True if the page should be converted to A4
+    """
+    long_side = max(page_width, page_height)
+    short_side = min(page_width, page_height)
+    if short_side <= 0:
+        return True
+
+    for width, height in ((A4_WIDTH_PT, A4_HEIGHT_PT), (LETTER_WIDTH_PT, LETTER_HEIGHT_PT)):
+        if abs(short_side - width) <= tolerance and abs(long_side - height) <= tolerance:
+            return False
+    return True
+
+
+def _render_page(src_doc, page_num: int, dpi: int, image_format: str = "png") -> Tuple[bytes, PageMetadata]:
+    """
+    Convert one PDF page to A4 size (if needed) and render it to an image.
+
+    A4 and US Letter pages (either orientation) are rendered directly (see _needs_a4_conversion).
+
+    Args:
+        src_doc: Open PyMuPDF document
+        page_num: 0-indexed page number
+        dpi: Resolution for image conversion
+        image_format: "png" (lossless) or "jpeg" (quality 90, typically 3-5x smaller)
+
+    Returns:
+        Tuple of (encoded image bytes, PageMetadata with transformation info)
+    """
+    src_page = src_doc[page_num]
+    page_width = src_page.rect.width
+    page_height = src_page.rect.height
+
+    if not _needs_a4_conversion(page_width, page_height):
+        # A4 / Letter page: render directly
+        logger.debug("Page %d: Rendering as-is (%.1f x %.1f)", page_num + 1, page_width, page_height)
+        zoom = dpi / 72
+        mat = fitz.Matrix(zoom, zoom)
+        pix = src_page.get_pixmap(matrix=mat)
+
+        metadata = PageMetadata(
+            page_number=page_num + 1,
+            original_width_pt=page_width,
+            original_height_pt=page_height,
+            was_converted=False,
+            scale=1.0,
+            x_offset_pt=0.0,
+            y_offset_pt=0.0,
+            image_width_px=pix.width,
+            image_height_px=pix.height,
+            dpi=dpi
+        )
+    else:
+        # Create a temporary document with A4 page
+        temp_doc = fitz.open()
+        new_page = temp_doc.new_page(width=A4_WIDTH_PT, height=A4_HEIGHT_PT)
+
+        # Calculate scaling to fit the content on A4 while maintaining aspect ratio
+        scale_x = A4_WIDTH_PT / page_width
+        scale_y = A4_HEIGHT_PT / page_height
+        scale = min(scale_x, scale_y)
+
+        # Calculate new dimensions after scaling
+        new_width = page_width * scale
+        new_height = page_height * scale
+
+        # Calculate position to center the content
+        x_offset = (A4_WIDTH_PT - new_width) / 2
+        y_offset = (A4_HEIGHT_PT - new_height) / 2
+
+        # Define the target rectangle on the new A4 page
+        target_rect = fitz.Rect(
+            x_offset,
+            y_offset,
+            x_offset + new_width,
+            y_offset + new_height
+        )
+
+        # Copy the source page content to the new page
+        new_page.show_pdf_page(target_rect, src_doc, page_num)
+
+        logger.debug("Page %d: Converted to A4 (%.1f x %.1f -> %s x %s)",
+                    page_num + 1, page_width, page_height, A4_WIDTH_PT, A4_HEIGHT_PT)
+
+        # Render the A4 page to image
+        zoom = dpi / 72
+        mat = fitz.Matrix(zoom, zoom)
+        pix = new_page.get_pixmap(matrix=mat)
+
+        metadata = PageMetadata(
+            page_number=page_num + 1,
+            original_width_pt=page_width,
+            original_height_pt=page_height,
+            was_converted=True,
+            scale=scale,
+            x_offset_pt=x_offset,
+            y_offset_pt=y_offset,
+            image_width_px=pix.width,
+            image_height_px=pix.height,
+            dpi=dpi
+        )
+
+        temp_doc.close()
+
+    # Encode pixmap (PNG or JPEG); base64 is left to the caller
+    if image_format == "jpeg":
+        image_bytes = pix.tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    else:
+        image_bytes = pix.tobytes("png")
+
+    logger.debug("Page %d: Converted to image (%d x %d pixels)",
+                page_num + 1, pix.width, pix.height)
+
+    return image_bytes, metadata
+
+
+def _render_page_from_file(file_path: str, page_num: int, dpi: int,
+                           image_format: str = "png") -> Tuple[int, bytes, PageMetadata]:
+    """
+    Process-pool entry point: open the PDF in the worker and render a single page.
+
+    Returns raw image bytes rather than base64, so a quarter less data is pickled
+    back to the parent.
+    """
+    with fitz.open(file_path) as src_doc:
+        image_bytes, metadata = _render_page(src_doc, page_num, dpi, image_format)
+    return page_num, image_bytes, metadata
+
+
+def _split_pdf(file_path: str, chunk_pages: int, output_dir: str) -> List[Tuple[int, str]]:
+    """
+    Split a PDF into consecutive chunks of at most chunk_pages pages.
+
+    Args:
+        file_path: Source PDF
+        chunk_pages: Pages per chunk
+        output_dir: Directory for the chunk PDFs
+
+    Returns:
+        List of (0-based index of the chunk's first page, chunk PDF path)
+    """
+    chunks = []
+    with fitz.open(file_path) as src_doc:
+        page_count = len(src_doc)
+        for start in range(0, page_count, chunk_pages):
+            end = min(start + chunk_pages, page_count) - 1
+            chunk_path = os.path.join(output_dir, f"chunk_{start:05d}.pdf")
+            with fitz.open() as chunk_doc:
+                chunk_doc.insert_pdf(src_doc, from_page=start, to_page=end)
+                # Keep chunk bytes stable across runs so the OCR cache can hit
+                chunk_doc.save(chunk_path, garbage=3, deflate=True, no_new_id=True)
+            chunks.append((start, chunk_path))
+    return chunks
+
+
+def _merge_ocr_chunks(chunks) -> Tuple[Dict[str, Any], List[PageMetadata]]:
+    """
+    Merge per-chunk OCR results into one document-level result.
+
+    The first chunk's result (including empty_page_detection) is kept as-is.
+    Pages of later chunks are renumbered from the Original_Page_Number Gemini
+    returned for them (offset by the chunk's first page), shifted by one when
+    the first chunk inserted a blank summary page; any blank page a later chunk
+    "inserted" is dropped. Chunks must still have normalized coordinates; they
+    are converted afterwards against the document-level metadata.
+
+    Args:
+        chunks: List of (first page index, parsed OCR dict, chunk PageMetadata list)
+
+    Returns:
+        Tuple of (merged OCR dict, PageMetadata list for the whole document)
+    """
+    _, first_result, first_metadata = chunks[0]
+    detection = first_result.get("empty_page_detection") or {}
+    shift = 1 if detection.get("insert_blank_page") else 0
+
+    pages = list(first_result.get("Pages", []))
+    pages_metadata = list(first_metadata)
+
+    for start, result, chunk_metadata in chunks[1:]:
+        position = 0
+        for page in result.get("Pages", []):
+            if page.get("Is_Inserted_Blank"):
+                continue
+            position += 1
+            chunk_number = page.get("Original_Page_Number")
+            if not isinstance(chunk_number, int):
+                chunk_number = position
+            original_number = start + chunk_number
+            page["Original_Page_Number"] = original_number
+            page["Page_Number"] = original_number + shift
+            page["Is_Summary_Page"] = False
+            pages.append(page)
+        pages_metadata.extend(replace(m, page_number=m.page_number + start) for m in chunk_metadata)
+
+    merged = dict(first_result)
+    merged["Pages"] = pages
+    return merged, pages_metadata
+
+
+def _ocr_cache_key(processor, arguments) -> str:
+    """Cache key for extract_ocr: PDF bytes + prompt + rendering / model settings."""
+    hasher = _new_hasher()
+    _hash_file(hasher, arguments["file_path"])
+    hasher.update(_hash_parts(
+        _get_prompt(),
+        200,  # dpi used by _convert_pdf_to_images
+        arguments["image_format"],
+        arguments["convert_coords"],
+        processor.vertex_model_name,
+    ).encode("ascii"))
+    return "ocr-" + hasher.hexdigest()
+
+
+def _encode_ocr(result) -> Dict[str, Any]:
+    ocr_text, _, pages_metadata = result
+    return {"text": ocr_text, "pages": [asdict(m) for m in pages_metadata]}
+
+
+def _decode_ocr(value) -> Tuple[str, None, List[PageMetadata]]:
+    # Only the text is stored; callers parse it if they need the dict
+    return value["text"], None, [PageMetadata(**m) for m in value["pages"]]
+
+
 class DocumentProcessor:
     """
     Document processor class that handles OCR extraction via Vertex AI
@@ -202,123 +813,57 @@ class DocumentProcessor:
         self.openai_api_key = openai_api_key
         self.openai_assistant_id = openai_assistant_id
 
-    def _convert_pdf_to_images(self, file_path: str, dpi: int = 200) -> Tuple[List[str], List[PageMetadata]]:
+    def _convert_pdf_to_images(self, file_path: str, dpi: int = 200,
+                               image_format: str = "png") -> Tuple[List[bytes], List[PageMetadata]]:
         """
         Convert each page of the PDF to A4 size (if needed) and then to an image.
         Also stores metadata about original dimensions and transformations for coordinate conversion.
+        Pages are rendered in the shared process pool when available, serially otherwise.
+        Images are returned as raw bytes; base64 encoding happens while building the request body.
 
         Args:
             file_path: Path to the input PDF file
             dpi: Resolution for image conversion (default: 200)
+            image_format: "png" or "jpeg" (default: png)
 
         Returns:
             Tuple containing:
-                - List of base64 encoded PNG images, one per page
+                - List of encoded images (PNG/JPEG bytes), one per page
                 - List of PageMetadata objects with transformation info
         """
-        TOLERANCE = 1.0  # Allow 1 point tolerance for floating point comparison
-
         # Open the source PDF
         src_doc = fitz.open(file_path)
-
-        # Lists to store results
-        images_base64 = []
-        pages_metadata = []
-
-        for page_num in range(len(src_doc)):
-            src_page = src_doc[page_num]
-            page_width = src_page.rect.width
-            page_height = src_page.rect.height
-
-            # Check if page is already A4 (within tolerance)
-            is_a4 = (
-                abs(page_width - A4_WIDTH_PT) <= TOLERANCE and
-                abs(page_height - A4_HEIGHT_PT) <= TOLERANCE
-            )
-
-            if is_a4:
-                # Page is already A4, render directly
-                logger.debug("Page %d: Already A4 (%.1f x %.1f)", page_num + 1, page_width, page_height)
-                zoom = dpi / 72
-                mat = fitz.Matrix(zoom, zoom)
-                pix = src_page.get_pixmap(matrix=mat)
-
-                metadata = PageMetadata(
-                    page_number=page_num + 1,
-                    original_width_pt=page_width,
-                    original_height_pt=page_height,
-                    was_converted=False,
-                    scale=1.0,
-                    x_offset_pt=0.0,
-                    y_offset_pt=0.0,
-                    image_width_px=pix.width,
-                    image_height_px=pix.height,
-                    dpi=dpi
-                )
+        page_count = len(src_doc)
+
+        images = [None] * page_count
+        pages_metadata = [None] * page_count
+
+        # Fan pages out to worker processes; tiny PDFs aren't worth the pool overhead
+        rendered = False
+        if page_count >= 2:
+            futures = [process_pool.submit(_render_page_from_file, file_path, page_num, dpi, image_format)
+                       for page_num in range(page_count)]
+            if all(future is not None for future in futures):
+                try:
+                    for future in as_completed(futures):
+                        page_num, image_bytes, metadata = future.result()
+                        images[page_num] = image_bytes
+                        pages_metadata[page_num] = metadata
+                    rendered = True
+                except Exception as e:
+                    logger.warning("Parallel page rendering failed (%s); rendering serially", e)
             else:
-                # Create a temporary document with A4 page
-                temp_doc = fitz.open()
-                new_page = temp_doc.new_page(width=A4_WIDTH_PT, height=A4_HEIGHT_PT)
-
-                # Calculate scaling to fit the content on A4 while maintaining aspect ratio
-                scale_x = A4_WIDTH_PT / page_width
-                scale_y = A4_HEIGHT_PT / page_height
-                scale = min(scale_x, scale_y)
-
-                # Calculate new dimensions after scaling
-                new_width = page_width * scale
-                new_height = page_height * scale
-
-                # Calculate position to center the content
-                x_offset = (A4_WIDTH_PT - new_width) / 2
-                y_offset = (A4_HEIGHT_PT - new_height) / 2
-
-                # Define the target rectangle on the new A4 page
-                target_rect = fitz.Rect(
-                    x_offset,
-                    y_offset,
-                    x_offset + new_width,
-                    y_offset + new_height
-                )
-
-                # Copy the source page content to the new page
-                new_page.show_pdf_page(target_rect, src_doc, page_num)
-
-                logger.debug("Page %d: Converted to A4 (%.1f x %.1f -> %s x %s)",
-                            page_num + 1, page_width, page_height, A4_WIDTH_PT, A4_HEIGHT_PT)
-
-                # Render the A4 page to image
-                zoom = dpi / 72
-                mat = fitz.Matrix(zoom, zoom)
-                pix = new_page.get_pixmap(matrix=mat)
-
-                metadata = PageMetadata(
-                    page_number=page_num + 1,
-                    original_width_pt=page_width,
-                    original_height_pt=page_height,
-                    was_converted=True,
-                    scale=scale,
-                    x_offset_pt=x_offset,
-                    y_offset_pt=y_offset,
-                    image_width_px=pix.width,
-                    image_height_px=pix.height,
-                    dpi=dpi
-                )
+                for future in futures:
+                    if future is not None:
+                        future.cancel()
 
-                temp_doc.close()
-
-            # Convert pixmap to PNG bytes and then to base64
-            png_bytes = pix.tobytes("png")
-            base64_image = base64.b64encode(png_bytes).decode("utf-8")
-            images_base64.append(base64_image)
-            pages_metadata.append(metadata)
-
-            logger.debug("Page %d: Converted to image (%d x %d pixels)",
-                        page_num + 1, pix.width, pix.height)
+        if not rendered:
+            for page_num in range(page_count):
+                images[page_num], pages_metadata[page_num] = _render_page(src_doc, page_num, dpi, image_format)
 
         src_doc.close()
 
-        return images_base64, pages_metadata
+        return images, pages_metadata
 
     def normalized_to_pdf_coords(
         self,
@@ -372,56 +917,101 @@ class DocumentProcessor:
     def convert_ocr_result_coords(
         self,
         ocr_result: Dict[str, Any],
-        pages_metadata: List[PageMetadata]
+        pages_metadata: Union[List[PageMetadata], Dict[int, PageMetadata]]
     ) -> Dict[str, Any]:
         """
         Convert all normalized coordinates in OCR result to PDF coordinates.
+
+        pages_metadata may be a list or an already-built {page_number: PageMetadata} dict.
         """
-        metadata_by_page = {m.page_number: m for m in pages_metadata}
+        if isinstance(pages_metadata, dict):
+            metadata_by_page = pages_metadata
+        else:
+            metadata_by_page = {m.page_number: m for m in pages_metadata}
 
         if "Pages" not in ocr_result:
             return ocr_result
 
         for page in ocr_result["Pages"]:
-            page_num = page.get("Page_Number", 1)
+            # Metadata is per page of the submitted PDF, so an inserted blank
+            # page must not shift the lookup for the pages after it
+            page_num = page.get("Original_Page_Number") or page.get("Page_Number", 1)
             metadata = metadata_by_page.get(page_num)
 
             if not metadata:
                 logger.warning("No metadata found for page %d", page_num)
                 continue
 
+            # The whole normalized -> PDF-point conversion is one affine map per axis;
+            # work out its coefficients once per page instead of per line
+            ax, bx, ay, by = _page_affine(metadata)
+            max_x = metadata.original_width_pt
+            max_y = metadata.original_height_pt
+
             for block in page.get("Blocks", []):
                 for line in block.get("Lines", []):
                     if "Coordinates" in line and len(line["Coordinates"]) == 4:
                         normalized_coords = line["Coordinates"]
-                        pdf_coords = self.normalized_to_pdf_coords(normalized_coords, metadata)
-                        line["Coordinates"] = pdf_coords
+                        x1, y1, x2, y2 = normalized_coords
+                        line["Coordinates"] = [
+                            round(max(0.0, min(x1 * ax + bx, max_x)), 2),
+                            round(max(0.0, min(y1 * ay + by, max_y)), 2),
+                            round(max(0.0, min(x2 * ax + bx, max_x)), 2),
+                            round(max(0.0, min(y2 * ay + by, max_y)), 2),
+                        ]
                         line["Coordinates_Normalized"] = normalized_coords
 
         return ocr_result
 
-    def extract_text(self, file_path: str, convert_coords: bool = True) -> Tuple[str, List[PageMetadata]]:
+    def extract_text(self, file_path: str, convert_coords: bool = True,
+                     image_format: str = "png", use_cache: bool = True) -> Tuple[str, List[PageMetadata]]:
         """
         Extract and clean text from a PDF using Google Vertex AI.
 
         Args:
             file_path: Path to the PDF file to process
             convert_coords: Whether to convert normalized coords to PDF coords
+            image_format: Page image encoding sent to Gemini, "png" or "jpeg"
+                          (JPEG cuts the request payload several-fold)
+            use_cache: Reuse a stored result for the same PDF and settings (default: True)
 
         Returns:
             Tuple containing:
                 - JSON string containing cleaned text with coordinates
                 - List of PageMetadata objects for coordinate conversion
         """
-        # Read the prompt from external file
-        prompt_file_path = os.path.join(os.path.dirname(__file__), "gemini-prompt.txt")
-        with open(prompt_file_path, "r") as f:
-            prompt = f.read()
+        ocr_text, _, pages_metadata = self.extract_ocr(file_path, convert_coords, image_format, use_cache=use_cache)
+        return ocr_text, pages_metadata
+
+    @_cached(_ocr_cache_key, encode=_encode_ocr, decode=_decode_ocr)
+    def extract_ocr(self, file_path: str, convert_coords: bool = True,
+                    image_format: str = "png") -> Tuple[str, Union[Dict[str, Any], None], List[PageMetadata]]:
+        """
+        Like extract_text, but also hands back the parsed OCR result when one was built.
+
+        Coordinate conversion already parses the Gemini output, so callers that
+        need the dict can use it directly instead of parsing the JSON string again.
+
+        Args:
+            file_path: Path to the PDF file to process
+            convert_coords: Whether to convert normalized coords to PDF coords
+            image_format: Page image encoding sent to Gemini, "png" or "jpeg"
+            use_cache: Reuse a stored result for the same PDF and settings (default: True)
+
+        Returns:
+            Tuple containing:
+                - JSON string containing cleaned text with coordinates
+                - Parsed OCR result, or None if it was not parsed here (caller parses the string)
+                - List of PageMetadata objects for coordinate conversion
+        """
+        prompt = _get_prompt()
 
         # Convert PDF pages to A4 images and get metadata
         logger.info("Converting PDF pages to A4 images...")
-        images_base64, pages_metadata = self._convert_pdf_to_images(file_path)
-        logger.info("Conversion complete. %d page(s) converted to images.", len(images_base64))
+        if image_format not in IMAGE_MIME_TYPES:
+            raise ValueError(f"Unsupported image_format: {image_format}")
+        images, pages_metadata = self._convert_pdf_to_images(file_path, image_format=image_format)
+        logger.info("Conversion complete. %d page(s) converted to images.", len(images))
         logger.info("Sending to Vertex AI...")
 
         # Build the Vertex AI endpoint URL
@@ -432,58 +1022,110 @@ class DocumentProcessor:
             f"?key={self.vertex_api_key}"
         )
 
-        # Build the parts list with prompt and all images
-        parts = [{"text": prompt}]
-        for img_base64 in images_base64:
-            parts.append({
-                "inline_data": {
-                    "mime_type": "image/png",
-                    "data": img_base64,
-                }
-            })
-
-        # Build the request payload
-        payload = {
-            "contents": [
-                {
-                    "role": "user",
-                    "parts": parts,
-                }
-            ],
-            "generationConfig": {
+        # Build the request body (prompt + all page images) directly as bytes
+        body = _build_generate_content_body(
+            prompt,
+            images,
+            IMAGE_MIME_TYPES[image_format],
+            {
                 "temperature": 0.2,
                 "maxOutputTokens": 65536,
                 "responseMimeType": "application/json",
             },
-        }
+        )
+        del images  # raw page images are no longer needed once they are in the body
 
         # Make the API request with retry logic (10 min timeout for large documents)
-        # Using verify=False due to SSL issues in Docker containers
-        session = create_retry_session(retries=3, backoff_factor=2)
-        response = session.post(endpoint, json=payload, timeout=600, verify=False)
+        session = _get_session("vertex")
+        response = _post_with_rate_limit(
+            session,
+            endpoint,
+            VERTEX_RATE_LIMIT_MARKERS,
+            data=body,
+            headers={"Content-Type": "application/json"},
+            timeout=600,
+            verify=SSL_VERIFY,
+        )
+        del body
 
         if not response.ok:
             raise RuntimeError(f"Vertex AI failed: {response.text}")
 
-        data = response.json()
+        data = _json_loads(response.content)
 
         # Extract the text from the response
         try:
             ocr_text = data["candidates"][0]["content"]["parts"][0]["text"]
         except (KeyError, IndexError):
-            return json.dumps(data, indent=2, ensure_ascii=False), pages_metadata
+            return _json_dumps_pretty(data), None, pages_metadata
 
         # If coordinate conversion is enabled, convert normalized coords to PDF coords
         if convert_coords:
             try:
                 ocr_result = safe_json_loads(ocr_text)
                 ocr_result = self.convert_ocr_result_coords(ocr_result, pages_metadata)
-                return json.dumps(ocr_result, indent=2, ensure_ascii=False), pages_metadata
+                return _json_dumps_pretty(ocr_result), ocr_result, pages_metadata
             except json.JSONDecodeError:
                 logger.warning("Could not parse OCR result for coordinate conversion")
-                return ocr_text, pages_metadata
+                return ocr_text, None, pages_metadata
 
-        return ocr_text, pages_metadata
+        return ocr_text, None, pages_metadata
+
+    def extract_ocr_chunked(self, file_path: str, convert_coords: bool = True, image_format: str = "png",
+                            chunk_pages: int = OCR_CHUNK_PAGES,
+                            max_workers: int = OCR_CHUNK_WORKERS) -> Tuple[str, Union[Dict[str, Any], None], List[PageMetadata]]:
+        """
+        extract_ocr for long PDFs: OCR chunk_pages-page pieces concurrently and merge them.
+
+        Documents that fit in one chunk (or chunk_pages <= 0) go through extract_ocr
+        unchanged. Chunks are OCR'd without coordinate conversion; coordinates are
+        converted once after merging, against the whole document's metadata. If any
+        chunk's output cannot be parsed, the whole document is retried as a single
+        request.
+
+        Args:
+            file_path: Path to the PDF file to process
+            convert_coords: Whether to convert normalized coords to PDF coords
+            image_format: Page image encoding sent to Gemini, "png" or "jpeg"
+            chunk_pages: Pages per request
+            max_workers: Maximum concurrent Gemini requests
+
+        Returns:
+            Same as extract_ocr
+        """
+        with fitz.open(file_path) as doc:
+            page_count = len(doc)
+
+        if chunk_pages <= 0 or page_count <= chunk_pages:
+            return self.extract_ocr(file_path, convert_coords, image_format)
+
+        with tempfile.TemporaryDirectory(prefix="ocr-chunks-") as chunk_dir:
+            chunks = _split_pdf(file_path, chunk_pages, chunk_dir)
+            logger.info("OCR of %d pages split into %d chunks of up to %d pages",
+                        page_count, len(chunks), chunk_pages)
+
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+                results = list(executor.map(
+                    lambda chunk: self.extract_ocr(chunk[1], False, image_format),
+                    chunks,
+                ))
+
+        parsed = []
+        for (start, _), (chunk_text, _, chunk_metadata) in zip(chunks, results):
+            try:
+                chunk_result = safe_json_loads(chunk_text)
+            except json.JSONDecodeError:
+                chunk_result = None
+            if not isinstance(chunk_result, dict) or "Pages" not in chunk_result:
+                logger.warning("Could not merge OCR chunk starting at page %d; OCR'ing the whole document at once",
+                               start + 1)
+                return self.extract_ocr(file_path, convert_coords, image_format)
+            parsed.append((start, chunk_result, chunk_metadata))
+
+        ocr_result, pages_metadata = _merge_ocr_chunks(parsed)
+        if convert_coords:
+            ocr_result = self.convert_ocr_result_coords(ocr_result, pages_metadata)
+        return _json_dumps_pretty(ocr_result), ocr_result, pages_metadata
 
     def evaluate_text_assistant_ai(
         self,
@@ -514,8 +1156,8 @@ class DocumentProcessor:
             "OpenAI-Beta": "assistants=v2",
         }
 
-        # Create session with retry logic
-        session = create_retry_session(retries=3, backoff_factor=2)
+        # Shared session with retry logic
+        session = _get_session("openai")
 
         # Upload model answer PDF if provided
         file_id = None
@@ -534,7 +1176,7 @@ class DocumentProcessor:
                         "https://api.openai.com/v1/files",
                         headers=upload_headers,
                         files=files,
-                        verify=False,
+                        verify=SSL_VERIFY,
                     )
 
                 if upload_response.ok:
@@ -591,11 +1233,13 @@ MODEL ANSWER (OCR extracted):
                 ],
             }
 
-        thread_response = session.post(
+        thread_response = _post_with_rate_limit(
+            session,
             "https://api.openai.com/v1/threads",
+            OPENAI_RATE_LIMIT_MARKERS,
             headers=headers,
             json=thread_payload,
-            verify=False,
+            verify=SSL_VERIFY,
         )
 
         if not thread_response.ok:
@@ -605,14 +1249,16 @@ MODEL ANSWER (OCR extracted):
         thread_id = thread_data.get("id")
 
         # 2. Create the run
-        run_response = session.post(
+        run_response = _post_with_rate_limit(
+            session,
             f"https://api.openai.com/v1/threads/{thread_id}/runs",
+            OPENAI_RATE_LIMIT_MARKERS,
             headers=headers,
             json={
                 "assistant_id": self.openai_assistant_id,
                 "response_format": {"type": "json_object"},
             },
-            verify=False,
+            verify=SSL_VERIFY,
         )
 
         if not run_response.ok:
@@ -624,25 +1270,29 @@ MODEL ANSWER (OCR extracted):
         if not run_id:
             raise RuntimeError(f"Run ID missing in response: {json.dumps(run_data)}")
 
-        # 3. Poll for completion with timeout and retry logic
+        # 3. Poll for completion with timeout and retry logic.
+        # Exponential backoff with jitter: fast runs are noticed within ~0.5s,
+        # slow runs are polled at most every ~5s.
         status = None
         max_wait_time = 600  # Maximum 10 minutes for OpenAI to complete
-        poll_interval = 3   # Check every 3 seconds
-        elapsed_time = 0
+        poll_delay = POLL_INITIAL_DELAY
+        elapsed_time = 0.0
 
         while status not in ["completed", "failed", "cancelled", "expired"]:
             if elapsed_time >= max_wait_time:
                 logger.warning("OpenAI Assistant timed out after %d seconds", elapsed_time)
                 raise RuntimeError(f"OpenAI Assistant timed out after {max_wait_time} seconds")
 
-            time.sleep(poll_interval)
-            elapsed_time += poll_interval
+            sleep_time = poll_delay + random.uniform(0, POLL_JITTER)
+            time.sleep(sleep_time)
+            elapsed_time += sleep_time
+            poll_delay = min(poll_delay * POLL_BACKOFF_FACTOR, POLL_MAX_DELAY)
 
             try:
                 status_response = session.get(
                     f"https://api.openai.com/v1/threads/{thread_id}/runs/{run_id}",
                     headers=headers,
-                    verify=False,
+                    verify=SSL_VERIFY,
                     timeout=30,
                 )
 
@@ -665,7 +1315,7 @@ MODEL ANSWER (OCR extracted):
         messages_response = session.get(
             f"https://api.openai.com/v1/threads/{thread_id}/messages",
             headers=headers,
-            verify=False,
+            verify=SSL_VERIFY,
         )
 
         if not messages_response.ok:
@@ -694,17 +1344,11 @@ MODEL ANSWER (OCR extracted):
                 "parsed": None,
             }
 
-    def _clean_json_response(self, text: str) -> str:
+    @staticmethod
+    @_memoize
+    def _clean_json_response(text: str) -> str:
         """Clean JSON response by removing markdown code blocks."""
         text = text.strip()
-
-        if text.startswith("```json"):
-            text = text[7:]
-        elif text.startswith("```"):
-            text = text[3:]
-
-        if text.endswith("```"):
-            text = text[:-3]
-
-        return text.strip()
+        text = text.removeprefix("```json") if text.startswith("```json") else text.removeprefix("```")
+        return text.removesuffix("```").strip()
 
@@ -0,0 +1,142 @@
+"""
+On-disk cache for downloaded PDFs, revalidated with conditional GETs.
+
+Entries are keyed by a SHA-256 of the URL and stored with the response's ETag,
+Last-Modified and Cache-Control max-age. A repeat download sends If-None-Match /
+If-Modified-Since and, on a 304 (or while max-age is still fresh), hard-links the
+cached copy into place instead of transferring the file again. Responses marked
+no-store, or without an ETag or Last-Modified, are not cached, and at most
+PDF_DOWNLOAD_CACHE_MAX_FILES entries are kept (least recently used go first).
+
+The cache only pays off when the same URL is downloaded repeatedly, so it is
+off unless PDF_DOWNLOAD_CACHE=1.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Off by default; independent of the OCR result cache (DEEP_EVAL_CACHE)
+PDF_DOWNLOAD_CACHE = os.environ.get('PDF_DOWNLOAD_CACHE', '0').lower() in ('1', 'true', 'yes')
+PDF_DOWNLOAD_CACHE_MAX_FILES = int(os.environ.get('PDF_DOWNLOAD_CACHE_MAX_FILES', '200'))
+
+# Copy buffer for streaming downloads to disk
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def link_or_copy(src: str, dst: str):
+    """Hard-link src to dst (same filesystem), falling back to a copy."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _cache_expiry(headers) -> float:
+    """Epoch time until which a response may be reused without revalidation (0 = always revalidate)."""
+    cache_control = headers.get('Cache-Control', '')
+    if 'no-cache' in cache_control:
+        return 0.0
+    match = _MAX_AGE_RE.search(cache_control)
+    return time.time() + int(match.group(1)) if match else 0.0
+
+
+def _prune_download_cache(cache_dir: str):
+    """Keep at most PDF_DOWNLOAD_CACHE_MAX_FILES cached PDFs, dropping the least recently used."""
+    try:
+        entries = [e for e in os.scandir(cache_dir) if e.name.endswith('.pdf')]
+        if len(entries) <= PDF_DOWNLOAD_CACHE_MAX_FILES:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - PDF_DOWNLOAD_CACHE_MAX_FILES]:
+            for path in (entry.path, entry.path[:-4] + '.json'):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+    except OSError as e:
+        logger.warning("[download_cache] Could not prune download cache: %s", e)
+
+
+def download_file(url: str, dest_path: str, cache_dir: str, session: requests.Session = None,
+                  use_cache: bool = PDF_DOWNLOAD_CACHE, **request_kwargs):
+    """
+    Download url to dest_path, going through the on-disk cache when use_cache is set.
+
+    Args:
+        url: URL to download
+        dest_path: Where to put the file (must not exist yet)
+        cache_dir: Cache directory; keep it on the same filesystem as dest_path so
+                   entries can be hard-linked instead of copied
+        session: requests session to download with (default: a plain requests.get)
+        use_cache: Whether to use the download cache (default: PDF_DOWNLOAD_CACHE env)
+        **request_kwargs: Passed to session.get (timeout, verify, ...)
+    """
+    cache_key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+    cached_pdf = os.path.join(cache_dir, cache_key + '.pdf')
+    cached_meta = os.path.join(cache_dir, cache_key + '.json')
+
+    meta = None
+    request_headers = {}
+    if use_cache and os.path.exists(cached_pdf):
+        try:
+            with open(cached_meta, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+    if meta is not None:
+        if meta.get('expires', 0) > time.time():
+            logger.info("[download_cache] Using cached download (fresh): %s", url)
+            link_or_copy(cached_pdf, dest_path)
+            return
+        if meta.get('etag'):
+            request_headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            request_headers['If-Modified-Since'] = meta['last_modified']
+
+    get = session.get if session is not None else requests.get
+
+    # Stream to disk in 1 MB chunks instead of holding the whole PDF in memory
+    with get(url, headers=request_headers, stream=True, **request_kwargs) as response:
+        if response.status_code == 304 and meta is not None:
+            logger.info("[download_cache] Using cached download (not modified): %s", url)
+            meta['expires'] = _cache_expiry(response.headers)
+            with open(cached_meta, 'w') as f:
+                json.dump(meta, f)
+            link_or_copy(cached_pdf, dest_path)
+            os.utime(cached_pdf)
+            return
+
+        response.raise_for_status()
+        response.raw.decode_content = True  # undo any Content-Encoding (gzip) on the fly
+        with open(dest_path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_BUFFER_SIZE)
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        expires = _cache_expiry(response.headers)
+        cacheable = 'no-store' not in response.headers.get('Cache-Control', '') and (etag or last_modified)
+
+    if use_cache and cacheable:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp_path = f"{cached_pdf}.{uuid.uuid4().hex}.tmp"
+            link_or_copy(dest_path, tmp_path)
+            os.replace(tmp_path, cached_pdf)
+            with open(cached_meta, 'w') as f:
+                json.dump({'url': url, 'etag': etag, 'last_modified': last_modified, 'expires': expires}, f)
+            _prune_download_cache(cache_dir)
+        except OSError as e:
+            logger.warning("[download_cache] Could not cache download: %s", e)
@@ -7,71 +7,283 @@ Uses Patrick Hand font for handwriting-style annotations.
 """
 
 import os
+import re
+import contextlib
 import uuid
+import string
 import random
 import logging
+import tempfile
+import threading
+import importlib.resources
+from functools import lru_cache
 import fitz  # PyMuPDF
 import requests
 import urllib.request
 
+from .download_cache import PDF_DOWNLOAD_CACHE, download_file
+from .tls import SSL_VERIFY
+
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
 # Font configuration
 FONT_SIZE_OVERRIDE = 16
 FONT_NAME = "PatrickHand"
+FONT_FILENAME = "PatrickHand-Regular.ttf"
 FONT_URL = "https://github.com/google/fonts/raw/main/ofl/patrickhand/PatrickHand-Regular.ttf"
 
+# Per-character advance widths (in units of font size) of the loaded annotation font,
+# filled by get_patrick_hand_font(). Characters not in the table use the old estimate.
+_ADVANCE = {}
+FALLBACK_ADVANCE = 0.55
+
+# Write annotated PDFs linearized ("fast web view") when LINEARIZE_PDF=1
+LINEARIZE_PDF = os.environ.get('LINEARIZE_PDF', '0').lower() in ('1', 'true', 'yes')
+
+# Parsed annotation font, loaded once per process
+_FONT = None
+_FONT_LOCK = threading.Lock()
+
+
+def _bundled_font_path():
+    """Path of the Patrick Hand font shipped with this package, or None if it is missing."""
+    try:
+        resource = importlib.resources.files(__package__ or __name__).joinpath(FONT_FILENAME)
+        if resource.is_file():
+            return str(resource)
+    except (ModuleNotFoundError, TypeError, ValueError):
+        pass
+
+    # Not imported as a package (e.g. run as a script): look next to this file
+    local_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), FONT_FILENAME)
+    return local_path if os.path.exists(local_path) else None
+
 
 def get_patrick_hand_font_path():
-    """Get the path to Patrick Hand font, downloading if necessary."""
-    font_dir = os.path.dirname(os.path.abspath(__file__))
-    font_path = os.path.join(font_dir, "PatrickHand-Regular.ttf")
+    """
+    Get the path to Patrick Hand font.
+
+    Uses the copy bundled with the package; only if that is missing is the font
+    downloaded (once) into the temp directory, which is writable even when the
+    package directory is not.
+    """
+    bundled_path = _bundled_font_path()
+    if bundled_path is not None:
+        return bundled_path
+
+    font_path = os.path.join(tempfile.gettempdir(), FONT_FILENAME)
 
     if not os.path.exists(font_path):
-        logger.info("[pdf_annotator] Downloading Patrick Hand font...")
-        try:
-            urllib.request.urlretrieve(FONT_URL, font_path)
-            logger.info("[pdf_annotator] Font downloaded to: %s", font_path)
-        except Exception as e:
-            logger.error("[pdf_annotator] Failed to download font: %s", e)
-            return None
+        with _FONT_LOCK:
+            # Another thread may have finished the download while we waited
+            if not os.path.exists(font_path):
+                logger.info("[pdf_annotator] Downloading Patrick Hand font...")
+                tmp_path = f"{font_path}.{os.getpid()}.tmp"
+                try:
+                    urllib.request.urlretrieve(FONT_URL, tmp_path)
+                    os.replace(tmp_path, font_path)  # never expose a half-written font file
+                    logger.info("[pdf_annotator] Font downloaded to: %s", font_path)
+                except Exception as e:
+                    logger.error("[pdf_annotator] Failed to download font: %s", e)
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    return None
 
     return font_path
 
 
 def get_patrick_hand_font():
-    """Download Patrick Hand font if not present and return the font object."""
+    """
+    Download Patrick Hand font if not present and return the font object.
+
+    The font is parsed once and reused for the life of the process; a failed
+    download/load is not cached, so a later call can retry.
+    """
+    global _FONT
+
+    if _FONT is not None:
+        return _FONT
+
     font_path = get_patrick_hand_font_path()
     if font_path is None:
         return None
 
-    try:
-        font = fitz.Font(fontfile=font_path)
-        return font
-    except Exception as e:
-        logger.error("[pdf_annotator] Failed to load font: %s", e)
-        return None
+    with _FONT_LOCK:
+        if _FONT is None:
+            try:
+                font = fitz.Font(fontfile=font_path)
+                _build_advance_table(font)
+                _FONT = font
+            except Exception as e:
+                logger.error("[pdf_annotator] Failed to load font: %s", e)
+                return None
+
+    return _FONT
+
+
+# Annotation color names (lowercase) -> RGB tuple (0-1 range)
+_COLOR_MAP = {
+    "red": (1, 0, 0),
+    "blue": (0, 0, 1),
+    "green": (0, 0.5, 0),
+    "black": (0, 0, 0),
+    "white": (1, 1, 1),
+    "yellow": (1, 1, 0),
+    "orange": (1, 0.5, 0),
+}
+_DEFAULT_RGB = (1, 0, 0)  # red
 
 
 def hex_to_rgb(color_name: str) -> tuple:
     """Convert color name to RGB tuple (0-1 range)."""
-    colors = {
-        "red": (1, 0, 0),
-        "blue": (0, 0, 1),
-        "green": (0, 0.5, 0),
-        "black": (0, 0, 0),
-        "white": (1, 1, 1),
-        "yellow": (1, 1, 0),
-        "orange": (1, 0.5, 0),
-    }
-    return colors.get(color_name.lower(), (1, 0, 0))  # default to red
+    # Names are almost always already lowercase; only lower() on a miss
+    rgb = _COLOR_MAP.get(color_name)
+    if rgb is None:
+        rgb = _COLOR_MAP.get(color_name.lower(), _DEFAULT_RGB)
+    return rgb
+
+
+def _build_advance_table(font):
+    """Precompute advance widths for the printable ASCII characters of font."""
+    _ADVANCE.clear()
+    for c in string.printable:
+        _ADVANCE[ord(c)] = font.glyph_advance(ord(c))
+    _wrap.cache_clear()
+
+
+def measure(text: str, size: float) -> float:
+    """
+    Width of text in points at the given font size, using the cached advance table.
+
+    Args:
+        text: Text to measure
+        size: Font size in points
+
+    Returns:
+        Approximate rendered width in points
+    """
+    advance = _ADVANCE
+    return sum(advance.get(ord(c), FALLBACK_ADVANCE) for c in text) * size
+
+
+@lru_cache(maxsize=4096)
+def _wrap(text: str, max_width: float, font_size: float) -> tuple:
+    """
+    Greedy word wrap so each line measures at most max_width points.
+
+    Line widths are accumulated word by word from the advance table.
+    Cached: the same comment / summary strings recur across pages and jobs.
 
+    Returns:
+        Tuple of lines
+    """
+    space_width = measure(" ", font_size)
+    lines = []
+    current_line = ""
+    current_width = 0.0
+
+    for word in text.split():
+        word_width = measure(word, font_size)
+        if not current_line:
+            current_line, current_width = word, word_width
+        elif current_width + space_width + word_width <= max_width:
+            current_line += " " + word
+            current_width += space_width + word_width
+        else:
+            lines.append(current_line)
+            current_line, current_width = word, word_width
+
+    if current_line:
+        lines.append(current_line)
+
+    return tuple(lines)
+
+
+@lru_cache(maxsize=256)
+def _score_text_layout(score_text: str, radius: float) -> tuple:
+    """Return (text_width, font_size) for a score label inside a circle of the given radius."""
+    # Calculate font size based on text length and circle radius
+    text_len = len(score_text)
+    if text_len <= 2:
+        font_size = radius * 1.2
+    elif text_len <= 4:
+        font_size = radius * 0.9
+    else:
+        font_size = radius * 0.7
+
+    text_width = text_len * font_size * 0.5
+    return text_width, font_size
 
-def draw_score_circle(page, x: float, y: float, score_text: str, color: tuple, font, radius: float = 24.5):
+
+def _writer_for(writers: dict, page_rect, rgb: tuple):
+    """Return the page's TextWriter for a color, creating it on first use."""
+    tw = writers.get(rgb)
+    if tw is None:
+        tw = writers[rgb] = fitz.TextWriter(page_rect)
+    return tw
+
+
+def _fill_textbox(writer, rect, pos, text: str, font, fontsize: float, line_spacing: float = 1.3) -> list:
+    """
+    Word-wrap text into rect on a TextWriter using MuPDF's line breaking.
+
+    Args:
+        writer: fitz.TextWriter collecting text for the page
+        rect: Rectangle the text must fit in
+        pos: Baseline start point of the first line
+        text: Text to insert
+        font: fitz.Font to render with (None for the default Helvetica)
+        fontsize: Font size in points
+        line_spacing: Distance between baselines as a multiple of fontsize
+
+    Returns:
+        List of lines that did not fit in rect
+    """
+    # A box shorter than one line puts pos outside rect, which fill_textbox
+    # rejects; nothing fits, so draw nothing rather than hit the error fallback
+    if not rect.contains(fitz.Point(pos)):
+        return [text]
+
+    overflow = writer.fill_textbox(
+        rect,
+        text,
+        pos=pos,
+        font=font,
+        fontsize=fontsize,
+        lineheight=line_spacing,
+        align=fitz.TEXT_ALIGN_LEFT,
+    )
+    return overflow or []
+
+
+def _flush_page(page, shape, writers: dict):
+    """
+    Write everything staged for a page in one go: shapes first, then text on top.
+
+    All annotation drawing goes through this single point, so each page gets one
+    new overlay content stream for shapes plus one per text color, no matter how
+    many annotations it has.
+
+    Args:
+        page: PyMuPDF page object
+        shape: Page Shape holding the staged drawings, or None if nothing was drawn
+        writers: {rgb: TextWriter} staged text, one writer per color
+    """
+    if shape is not None:
+        shape.commit(overlay=True)
+    for rgb, tw in writers.items():
+        tw.write_text(page, color=rgb, overlay=True)
+
+
+def draw_score_circle(page, x: float, y: float, score_text: str, color: tuple, font, radius: float = 24.5,
+                      shape=None, writer=None):
     """
     Draw a score inside a circle.
 
+    When shape/writer are given, the circle and text are only queued on them and
+    the caller commits/writes once per page; otherwise they are drawn immediately.
+
     Args:
         page: PyMuPDF page object
         x: X coordinate of circle center
@@ -80,53 +292,49 @@ def draw_score_circle(page, x: float, y: float, score_text: str, color: tuple, f
         color: RGB tuple for the circle and text color
         font: Font object to use for text
         radius: Radius of the circle in points (default 20)
+        shape: Shared page Shape for the circle outline (optional)
+        writer: Shared TextWriter for this color (optional)
     """
     # Draw the circle outline
     center = fitz.Point(x, y)
-    circle_rect = fitz.Rect(x - radius, y - radius, x + radius, y + radius)
 
     # Draw circle border
-    shape = page.new_shape()
+    commit_shape = shape is None
+    if commit_shape:
+        shape = page.new_shape()
     shape.draw_circle(center, radius)
     shape.finish(color=color, width=2, fill=None)  # Outline only, no fill
-    shape.commit()
-
-    # Calculate font size based on text length and circle radius
-    text_len = len(score_text)
-    if text_len <= 2:
-        font_size = radius * 1.2
-    elif text_len <= 4:
-        font_size = radius * 0.9
-    else:
-        font_size = radius * 0.7
+    if commit_shape:
+        shape.commit()
 
     # Center the text inside the circle
-    text_width = len(score_text) * font_size * 0.5
+    text_width, font_size = _score_text_layout(score_text, radius)
     text_x = x - text_width / 2
     text_y = y + font_size / 3  # Adjust for vertical centering
 
     # Draw the score text
-    tw = fitz.TextWriter(page.rect)
+    tw = writer if writer is not None else fitz.TextWriter(page.rect)
     if font:
         tw.append((text_x, text_y), score_text, fontsize=font_size, font=font)
     else:
         tw.append((text_x, text_y), score_text, fontsize=font_size)
-    tw.write_text(page, color=color)
+    if writer is None:
+        tw.write_text(page, color=color)
 
 
-def draw_tick_mark(page, x: float, y: float, color: tuple = (1, 0, 0), size: float = 15):
+def draw_tick_mark(shape, x: float, y: float, size: float = 15):
     """
-    Draw a tick/check mark at the specified position.
+    Add a tick/check mark path at the specified position to an open shape.
+
+    The caller finishes and commits the shape, so all ticks sharing a color and
+    stroke width go out in a single draw call.
 
     Args:
-        page: PyMuPDF page object
+        shape: PyMuPDF Shape to draw into (from page.new_shape())
         x: X coordinate of tick start
         y: Y coordinate of tick start
-        color: RGB tuple for the tick color (default red)
         size: Size of the tick mark in points (default 15)
     """
-    shape = page.new_shape()
-
     # Draw a proper checkmark (✓) shape
     # The checkmark has a short downward stroke on the left, then a longer upward stroke to the right
 
@@ -141,8 +349,6 @@ def draw_tick_mark(page, x: float, y: float, color: tuple = (1, 0, 0), size: flo
 
     # Draw the checkmark as a polyline
     shape.draw_polyline([p1, p2, p3])
-    shape.finish(color=color, width=2.5, lineCap=1, lineJoin=1, closePath=False)
-    shape.commit()
 
 
 def add_random_ticks_to_page(page, num_ticks: int = 3, color: tuple = (1, 0, 0)):
@@ -166,38 +372,48 @@ def add_random_ticks_to_page(page, num_ticks: int = 3, color: tuple = (1, 0, 0))
     # Divide the page into 3 vertical zones (top 1/3, middle 1/3, bottom 1/3)
     zone_height = (safe_bottom - safe_top) / 3
 
-    # Track used y-coordinates to ensure they don't match
-    used_y_coords = []
+    # Sample each y from its zone inset by half the 20pt minimum spacing on both
+    # sides: ticks in neighbouring zones are then always >= 20 points apart,
+    # with no rejection sampling needed
+    min_gap = 20
+    inset = min(min_gap / 2, zone_height / 2)
+    uniform = random.uniform
+
+    # All ticks share one shape and are stroked in a single finish/commit
+    shape = page.new_shape()
+
+    # Fixed size of 26 points
+    size = 26
 
     for zone_index in range(3):
-        # Calculate y range for this zone
         zone_top = safe_top + (zone_index * zone_height)
-        zone_bottom = zone_top + zone_height
+        x = uniform(safe_left, safe_right)
+        y = uniform(zone_top + inset, zone_top + zone_height - inset)
+        draw_tick_mark(shape, x, y, size)
 
-        # Generate random x position within safe zone
-        x = random.uniform(safe_left, safe_right)
-
-        # Generate y position within this zone, ensuring it doesn't match previous ones
-        max_attempts = 10
-        for _ in range(max_attempts):
-            y = random.uniform(zone_top, zone_bottom)
-            # Check if y is at least 20 points away from all previous y coords
-            is_unique = all(abs(y - prev_y) > 20 for prev_y in used_y_coords)
-            if is_unique:
-                break
+    shape.finish(color=color, width=2.5, lineCap=1, lineJoin=1, closePath=False)
+    shape.commit()
 
-        used_y_coords.append(y)
 
-        # Fixed size of 26 points
-        size = 26
+def _can_resize_in_place(page) -> bool:
+    """
+    True if the page can be grown by editing its MediaBox alone.
 
-        draw_tick_mark(page, x, y, color, size)
+    Rotated pages would grow on the wrong side, and set_mediabox drops any
+    CropBox, so pages whose visible area differs from the MediaBox go through
+    the copy path instead.
+    """
+    return page.rotation == 0 and page.cropbox == page.mediabox
 
 
 def add_margins(doc, right_margin_inches: float = 2.5, bottom_margin_inches: float = 1.0):
     """
     Add right and bottom margins to all pages in the document.
-    Creates new pages with expanded dimensions and copies original content.
+
+    Pages are enlarged in place by extending their MediaBox to the right and
+    downwards; the existing content streams are untouched and stay anchored at
+    the top-left. Documents with rotated or cropped pages fall back to copying
+    every page onto a larger blank page.
 
     Args:
         doc: PyMuPDF document object
@@ -210,11 +426,37 @@ def add_margins(doc, right_margin_inches: float = 2.5, bottom_margin_inches: flo
     right_margin_pts = right_margin_inches * 72  # 1 inch = 72 points
     bottom_margin_pts = bottom_margin_inches * 72
 
+    if all(_can_resize_in_place(page) for page in doc):
+        for page in doc:
+            # MediaBox is in PDF coordinates (y up): growing downwards means lowering y0
+            mediabox = page.mediabox
+            page.set_mediabox(fitz.Rect(
+                mediabox.x0,
+                mediabox.y0 - bottom_margin_pts,
+                mediabox.x1 + right_margin_pts,
+                mediabox.y1,
+            ))
+    else:
+        _add_margins_by_copy(doc, right_margin_pts, bottom_margin_pts)
+
+    return right_margin_pts, bottom_margin_pts
+
+
+def _add_margins_by_copy(doc, right_margin_pts: float, bottom_margin_pts: float):
+    """
+    Add margins by placing each page's content on a new, larger page.
+
+    Handles rotated and cropped pages, at the cost of re-serializing every page.
+
+    Args:
+        doc: PyMuPDF document object (modified in place)
+        right_margin_pts: Right margin width in points
+        bottom_margin_pts: Bottom margin height in points
+    """
     # Create a new document to hold the modified pages
     new_doc = fitz.open()
 
-    for page_idx in range(len(doc)):
-        old_page = doc[page_idx]
+    for page_idx, old_page in enumerate(doc):
         old_rect = old_page.rect
         old_width = old_rect.width
         old_height = old_rect.height
@@ -225,13 +467,14 @@ def add_margins(doc, right_margin_inches: float = 2.5, bottom_margin_inches: flo
         # Create a new blank page with the expanded dimensions
         new_page = new_doc.new_page(width=new_width, height=new_height)
 
-        # Check if the page has any content (text, images, or drawings)
-        # A blank page will have no text and no images
-        page_text = old_page.get_text().strip()
-        page_images = old_page.get_images()
-        page_drawings = old_page.get_drawings()
-
-        is_blank_page = len(page_text) == 0 and len(page_images) == 0 and len(page_drawings) == 0
+        # Check if the page has any content (images, text, or drawings).
+        # Cheapest check first: scanned answer sheets are almost always caught by
+        # get_images(), and get_drawings() only runs for pages with neither.
+        is_blank_page = not (
+            old_page.get_images(full=False)
+            or old_page.get_text("text", flags=0).strip()
+            or old_page.get_drawings()
+        )
 
         if not is_blank_page:
             # Define where to place the original content on the new page
@@ -247,25 +490,65 @@ def add_margins(doc, right_margin_inches: float = 2.5, bottom_margin_inches: flo
         # else: leave the new page blank (it's already blank)
 
     # Replace original doc pages with new ones
-    # First, delete all pages from original doc
-    while len(doc) > 0:
-        doc.delete_page(0)
+    # First, delete all pages from original doc (one page-tree update, not one per page)
+    if len(doc) > 0:
+        doc.delete_pages(from_page=0, to_page=len(doc) - 1)
 
     # Insert pages from new_doc into original doc
     doc.insert_pdf(new_doc)
 
     new_doc.close()
 
-    return right_margin_pts, bottom_margin_pts
 
+def _needs_margin(annotations: dict, doc) -> bool:
+    """
+    True if any annotation lands outside its page and so needs the added margins.
+
+    Each annotation is checked against its own page's rect, so mixed-size
+    documents are judged correctly. Summaries always go in the bottom margin.
+    Score circles need their full radius on the page; text is drawn into
+    Rect(x - 22, y, x - 22 + width, y + height), so its right and bottom edges
+    must fit (e.g. x=450, width=200 on a 595pt page ends at 628pt and needs the
+    right margin).
+    """
+    for page_num_str, page_annotations in annotations.items():
+        if not page_annotations:
+            continue
+        page_num = int(page_num_str) - 1
+        if page_num < 0 or page_num >= len(doc):
+            continue  # skipped when drawing as well
+        page_rect = doc[page_num].rect
+        page_width = page_rect.width
+        page_height = page_rect.height
 
-def download_pdf(pdf_url: str, output_dir: str) -> str:
+        for ann in page_annotations:
+            ann_type = ann.get("type")
+            if ann_type == "summary":
+                return True
+            x = ann.get("x", 0)
+            y = ann.get("y", 0)
+            if ann_type == "score":
+                radius = ann.get("radius", 20)
+                right, bottom = x + radius, y + radius
+            else:
+                right = x - 22 + ann.get("width", 200)
+                bottom = y + ann.get("height", 100)
+            if right > page_width or bottom > page_height:
+                return True
+    return False
+
+
+def download_pdf(pdf_url: str, output_dir: str, use_cache: bool = PDF_DOWNLOAD_CACHE) -> str:
     """
     Download a PDF from a URL.
 
+    With use_cache, the file is also kept under output_dir/.http_cache and
+    revalidated with a conditional GET on repeat downloads (see download_cache).
+
     Args:
         pdf_url: URL of the PDF to download
         output_dir: Directory to save the downloaded PDF
+        use_cache: Whether to use the on-disk download cache (default: PDF_DOWNLOAD_CACHE env)
 
     Returns:
         Path to the downloaded PDF file
@@ -276,14 +559,186 @@ def download_pdf(pdf_url: str, output_dir: str) -> str:
     file_id = str(uuid.uuid4())
     pdf_path = os.path.join(output_dir, f"{file_id}_input.pdf")
 
-    # Download with SSL verification disabled for compatibility
-    response = requests.get(pdf_url, verify=False, timeout=60)
-    response.raise_for_status()
+    download_file(pdf_url, pdf_path, os.path.join(output_dir, '.http_cache'),
+                  use_cache=use_cache, verify=SSL_VERIFY, timeout=60)
+    return pdf_path
 
-    with open(pdf_path, 'wb') as f:
-        f.write(response.content)
 
-    return pdf_path
+def _annotate_page(page, page_num_str: str, page_annotations: list, patrick_hand_font, rgb_by_color: dict):
+    """
+    Draw all annotations for one page and flush them to the page.
+
+    Pages are independent once margins and the font are ready, but PyMuPDF is
+    not thread-safe (and holds the GIL while drawing), so callers run this
+    serially for each page of a document.
+
+    Args:
+        page: PyMuPDF page object
+        page_num_str: 1-based page number as given in the annotations (for logging)
+        page_annotations: List of annotation dicts for this page
+        patrick_hand_font: Loaded fitz.Font, or None for the default font
+        rgb_by_color: Color name -> RGB tuple for every color used
+    """
+    # Check if ALL annotations on this page are type "summary"
+    # If so, this is an OverallSummary page - render with title and bullets at coordinates
+    all_summary = len(page_annotations) > 0 and all(
+        ann.get("type") == "summary" for ann in page_annotations
+    )
+
+    if all_summary:
+        logger.info("[pdf_annotator] Page %s - Detected as OverallSummary page (all %d annotations are type 'summary')",
+                   page_num_str, len(page_annotations))
+
+        bullet_shape = page.new_shape()
+        writers = {}
+
+        page_rect = page.rect
+        bullet_color = (0.2, 0.2, 0.2)  # Dark gray for text
+
+        # Render each summary item as a bullet point at its coordinates
+        for ann in page_annotations:
+            bullet_x = ann.get("x", 60)
+            bullet_y = ann.get("y", 110)
+            text = ann.get("text", "")
+            bullet_font_size = ann.get("fontSize", 14)
+            max_width = ann.get("width", 480)
+
+            # Draw bullet point (filled green circle)
+            bullet_shape.draw_circle(fitz.Point(bullet_x, bullet_y - 4), 4)
+            bullet_shape.finish(color=(0, 0.5, 0), fill=(0, 0.5, 0))  # Green bullet
+
+            # Wrap text for bullet point
+            lines = _wrap(text, max_width, bullet_font_size)
+
+            # Stage bullet text (one writer for all bullets instead of an insert_text per line)
+            tw = _writer_for(writers, page_rect, bullet_color)
+            text_x = bullet_x + 15
+            current_y = bullet_y
+
+            for line in lines:
+                if patrick_hand_font:
+                    tw.append(
+                        (text_x, current_y),
+                        line,
+                        fontsize=bullet_font_size,
+                        font=patrick_hand_font,
+                    )
+                else:
+                    tw.append(
+                        (text_x, current_y),
+                        line,
+                        fontsize=bullet_font_size,
+                    )
+                current_y += 20
+
+        _flush_page(page, bullet_shape, writers)
+
+        logger.info("[pdf_annotator] Page %s - OverallSummary rendered with %d bullet points",
+                   page_num_str, len(page_annotations))
+        return
+
+    # Batch drawing per page: one shape for all score circles, one TextWriter per color
+    page_rect = page.rect
+    shape = page.new_shape()
+    has_shapes = False
+    writers = {}
+
+    for ann in page_annotations:
+        x = ann.get("x", 0)
+        y = ann.get("y", 0)
+        text = ann.get("text", "")
+        color = ann.get("color", "red")
+        font_size = FONT_SIZE_OVERRIDE
+        width = ann.get("width", 200)
+        height = ann.get("height", 100)
+        ann_type = ann.get("type", "text")  # "text" or "score"
+        radius = ann.get("radius", 20)  # For score circles
+
+        logger.debug("[pdf_annotator] Page %s - Annotation type: %s, x: %s, y: %s",
+                    page_num_str, ann_type, x, y)
+
+        # Get RGB color
+        rgb = rgb_by_color[color]
+
+        try:
+            # Check if this is a score annotation (draw in circle)
+            if ann_type == "score":
+                draw_score_circle(page, x, y, text, rgb, patrick_hand_font, radius,
+                                  shape=shape, writer=_writer_for(writers, page_rect, rgb))
+                has_shapes = True
+                continue
+
+            # Check if this is a summary annotation (place in bottom margin)
+            if ann_type == "summary":
+                # Page dimensions (page_rect, already including margins)
+                # Bottom margin is 1 inch = 72 points
+                # The original content ends at (page_height - bottom_margin)
+                # We want to place summary in the bottom margin area
+                bottom_margin_pts = 72  # 1 inch
+
+                # Summary should start in the bottom margin area
+                # Original content area ends at: page_height - bottom_margin_pts
+                original_content_end = page_rect.height - bottom_margin_pts
+
+                # Place summary 15 points into the bottom margin
+                summary_y = original_content_end + 15
+                summary_x = 50  # Left padding
+                summary_width = page_rect.width - 100  # Leave some padding on both sides
+
+                logger.debug("[pdf_annotator] Page %s - Summary placement: x=%s, y=%s, page_height=%s",
+                            page_num_str, summary_x, summary_y, page_rect.height)
+
+                tw = _writer_for(writers, page_rect, rgb)
+
+                # Use smaller font for summary
+                summary_font_size = 14
+
+                # Word wrap the summary text into the bottom margin (MuPDF wraps with real glyph metrics)
+                _fill_textbox(
+                    tw,
+                    fitz.Rect(summary_x, summary_y, summary_x + summary_width, page_rect.height),
+                    (summary_x, summary_y + summary_font_size),
+                    text,
+                    patrick_hand_font,
+                    summary_font_size,
+                )
+                continue
+
+            # Regular text annotation
+            tw = _writer_for(writers, page_rect, rgb)
+
+            # Apply 0.3 inch (22 points) left offset for text in right margin
+            x_offset = 22  # 0.3 inch = 0.3 * 72 ≈ 22 points
+            adjusted_x = x - x_offset
+
+            # Word wrap the text into its box; lines that don't fit in the height are dropped
+            _fill_textbox(
+                tw,
+                fitz.Rect(adjusted_x, y, adjusted_x + width, y + height),
+                (adjusted_x, y + font_size),
+                text,
+                patrick_hand_font,
+                font_size,
+            )
+
+        except Exception as e:
+            logger.error("[pdf_annotator] Error adding annotation on page %s: %s", page_num_str, e)
+            # Fallback: use insert_text
+            try:
+                page.insert_text(
+                    (x, y + font_size),
+                    text[:50],
+                    fontsize=font_size,
+                    color=rgb,
+                )
+            except Exception as e2:
+                logger.error("[pdf_annotator] Fallback also failed: %s", e2)
+
+    # Flush the page: circle outlines first, then text on top, one write per color
+    try:
+        _flush_page(page, shape if has_shapes else None, writers)
+    except Exception as e:
+        logger.error("[pdf_annotator] Error writing annotations on page %s: %s", page_num_str, e)
 
 
 def add_annotations_to_pdf(pdf_path: str, annotations: dict, output_path: str, add_margin: bool = True) -> str:
@@ -306,269 +761,60 @@ def add_annotations_to_pdf(pdf_path: str, annotations: dict, output_path: str, a
     # Open PDF
     doc = fitz.open(pdf_path)
 
-    # Get page dimensions
-    first_page = doc[0]
-    page_height = first_page.rect.height
-    original_width = first_page.rect.width
-
-    # Add right and bottom margins if requested
-    if add_margin:
+    # Add right and bottom margins if requested and anything will actually be drawn there
+    if add_margin and _needs_margin(annotations, doc):
         add_margins(doc, right_margin_inches=2.5, bottom_margin_inches=1.0)
+    elif add_margin:
+        logger.info("[pdf_annotator] All annotations fit on the original pages; skipping margins")
 
     # DISABLED: Random tick marks on pages
-    # for page_num in range(len(doc)):
-    #     page = doc[page_num]
+    # for page in doc:
     #     add_random_ticks_to_page(page, num_ticks=3, color=(1, 0, 0))  # Red ticks
 
     # Load Patrick Hand font
     patrick_hand_font = get_patrick_hand_font()
 
+    # Resolve each distinct color name to RGB once, instead of per annotation
+    rgb_by_color = {
+        color: hex_to_rgb(color)
+        for page_annotations in annotations.values()
+        for color in {ann.get("color", "red") for ann in page_annotations}
+    }
+
     for page_num_str, page_annotations in annotations.items():
+        if not page_annotations:
+            continue  # nothing to draw; don't touch the page
+
         page_num = int(page_num_str) - 1  # Convert to 0-based index
 
         if page_num < 0 or page_num >= len(doc):
             logger.warning("[pdf_annotator] Page %s out of range, skipping", page_num_str)
             continue
 
+        # Pages are annotated one at a time: PyMuPDF documents must not be shared across threads
         page = doc[page_num]
+        _annotate_page(page, page_num_str, page_annotations, patrick_hand_font, rgb_by_color)
 
-        # Check if ALL annotations on this page are type "summary"
-        # If so, this is an OverallSummary page - render with title and bullets at coordinates
-        all_summary = len(page_annotations) > 0 and all(
-            ann.get("type") == "summary" for ann in page_annotations
+    # Save the annotated PDF: drop unused objects, compress new content streams
+    # (scanned page images are already compressed, so leave those alone).
+    # Write to a temp name and rename, so a crash never leaves a partial output_path.
+    tmp_path = output_path + '.tmp'
+    try:
+        doc.save(
+            tmp_path,
+            garbage=4,
+            deflate=True,
+            deflate_images=False,
+            clean=True,
+            linear=LINEARIZE_PDF,
         )
-
-        if all_summary:
-            logger.info("[pdf_annotator] Page %s - Detected as OverallSummary page (all %d annotations are type 'summary')",
-                       page_num_str, len(page_annotations))
-
-            font_path = get_patrick_hand_font_path()
-
-            # Render each summary item as a bullet point at its coordinates
-            for ann in page_annotations:
-                bullet_x = ann.get("x", 60)
-                bullet_y = ann.get("y", 110)
-                text = ann.get("text", "")
-                bullet_font_size = ann.get("fontSize", 14)
-                max_width = ann.get("width", 480)
-
-                # Draw bullet point (filled green circle)
-                shape = page.new_shape()
-                shape.draw_circle(fitz.Point(bullet_x, bullet_y - 4), 4)
-                shape.finish(color=(0, 0.5, 0), fill=(0, 0.5, 0))  # Green bullet
-                shape.commit()
-
-                # Wrap text for bullet point
-                words = text.split()
-                lines = []
-                current_line = ""
-
-                for word in words:
-                    test_line = current_line + " " + word if current_line else word
-                    if len(test_line) * 8 < max_width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-
-                if current_line:
-                    lines.append(current_line)
-
-                # Insert bullet text
-                bullet_color = (0.2, 0.2, 0.2)  # Dark gray for text
-                text_x = bullet_x + 15
-                current_y = bullet_y
-
-                for line in lines:
-                    if font_path:
-                        page.insert_text(
-                            fitz.Point(text_x, current_y),
-                            line,
-                            fontsize=bullet_font_size,
-                            color=bullet_color,
-                            fontname="patrickhand",
-                            fontfile=font_path
-                        )
-                    else:
-                        page.insert_text(
-                            fitz.Point(text_x, current_y),
-                            line,
-                            fontsize=bullet_font_size,
-                            color=bullet_color
-                        )
-                    current_y += 20
-
-            logger.info("[pdf_annotator] Page %s - OverallSummary rendered with %d bullet points",
-                       page_num_str, len(page_annotations))
-            continue  # Skip to next page
-
-        for ann in page_annotations:
-            x = ann.get("x", 0)
-            y = ann.get("y", 0)
-            text = ann.get("text", "")
-            color = ann.get("color", "red")
-            font_size = FONT_SIZE_OVERRIDE
-            width = ann.get("width", 200)
-            height = ann.get("height", 100)
-            ann_type = ann.get("type", "text")  # "text" or "score"
-            radius = ann.get("radius", 20)  # For score circles
-
-            logger.debug("[pdf_annotator] Page %s - Annotation type: %s, x: %s, y: %s",
-                        page_num_str, ann_type, x, y)
-
-            # Get RGB color
-            rgb = hex_to_rgb(color)
-
-            try:
-                # Check if this is a score annotation (draw in circle)
-                if ann_type == "score":
-                    draw_score_circle(page, x, y, text, rgb, patrick_hand_font, radius)
-                    continue
-
-                # Check if this is a summary annotation (place in bottom margin)
-                if ann_type == "summary":
-                    # Get page dimensions (page already has margins added)
-                    page_rect = page.rect
-                    # Bottom margin is 1 inch = 72 points
-                    # The original content ends at (page_height - bottom_margin)
-                    # We want to place summary in the bottom margin area
-                    bottom_margin_pts = 72  # 1 inch
-
-                    # Summary should start in the bottom margin area
-                    # Original content area ends at: page_height - bottom_margin_pts
-                    original_content_end = page_rect.height - bottom_margin_pts
-
-                    # Place summary 15 points into the bottom margin
-                    summary_y = original_content_end + 15
-                    summary_x = 50  # Left padding
-                    summary_width = page_rect.width - 100  # Leave some padding on both sides
-
-                    logger.debug("[pdf_annotator] Page %s - Summary placement: x=%s, y=%s, page_height=%s",
-                                page_num_str, summary_x, summary_y, page_rect.height)
-
-                    # Create text writer for summary
-                    tw = fitz.TextWriter(page_rect)
-
-                    # Use smaller font for summary
-                    summary_font_size = 14
-
-                    # Word wrap the summary text
-                    char_width = summary_font_size * 0.5
-                    chars_per_line = int(summary_width / char_width)
-
-                    words = text.split()
-                    lines = []
-                    current_line = ""
-
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        if len(test_line) <= chars_per_line:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                lines.append(current_line)
-                            current_line = word
-
-                    if current_line:
-                        lines.append(current_line)
-
-                    # Draw summary lines in bottom margin
-                    line_height = summary_font_size * 1.3
-                    current_y = summary_y + summary_font_size
-
-                    for line in lines:
-                        if patrick_hand_font:
-                            tw.append(
-                                (summary_x, current_y),
-                                line,
-                                fontsize=summary_font_size,
-                                font=patrick_hand_font,
-                            )
-                        else:
-                            tw.append(
-                                (summary_x, current_y),
-                                line,
-                                fontsize=summary_font_size,
-                            )
-                        current_y += line_height
-
-                    # Write summary with the specified color
-                    tw.write_text(page, color=rgb)
-                    continue
-
-                # Regular text annotation
-                # Create a text writer
-                tw = fitz.TextWriter(page.rect)
-
-                # Apply 0.3 inch (22 points) left offset for text in right margin
-                x_offset = 22  # 0.3 inch = 0.3 * 72 ≈ 22 points
-                adjusted_x = x - x_offset
-
-                # Calculate characters per line for word wrapping
-                char_width = font_size * 0.55
-                chars_per_line = int(width / char_width)
-
-                # Word wrap the text
-                words = text.split()
-                lines = []
-                current_line = ""
-
-                for word in words:
-                    test_line = current_line + (" " if current_line else "") + word
-                    if len(test_line) <= chars_per_line:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-
-                if current_line:
-                    lines.append(current_line)
-
-                # Draw each line
-                line_height = font_size * 1.3
-                current_y = y + font_size
-
-                for line in lines:
-                    if current_y + line_height > y + height:
-                        break
-
-                    if patrick_hand_font:
-                        tw.append(
-                            (adjusted_x, current_y),
-                            line,
-                            fontsize=font_size,
-                            font=patrick_hand_font,
-                        )
-                    else:
-                        tw.append(
-                            (adjusted_x, current_y),
-                            line,
-                            fontsize=font_size,
-                        )
-
-                    current_y += line_height
-
-                # Write to page with color
-                tw.write_text(page, color=rgb)
-
-            except Exception as e:
-                logger.error("[pdf_annotator] Error adding annotation on page %s: %s", page_num_str, e)
-                # Fallback: use insert_text
-                try:
-                    page.insert_text(
-                        (x, y + font_size),
-                        text[:50],
-                        fontsize=font_size,
-                        color=rgb,
-                    )
-                except Exception as e2:
-                    logger.error("[pdf_annotator] Fallback also failed: %s", e2)
-
-    # Save the annotated PDF
-    doc.save(output_path)
-    doc.close()
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_path)
+        raise
+    finally:
+        doc.close()
 
     return output_path
 
@@ -592,6 +838,7 @@ def process_pdf_with_annotations(pdf_url: str, annotations: dict, output_dir: st
 
     os.makedirs(output_dir, exist_ok=True)
 
+    input_pdf_path = None
     try:
         # Generate unique ID for this job
         job_id = str(uuid.uuid4())
@@ -615,10 +862,8 @@ def process_pdf_with_annotations(pdf_url: str, annotations: dict, output_dir: st
             doc.save(modified_pdf_path)
             doc.close()
             # Use the modified PDF for annotations
-            try:
-                os.remove(input_pdf_path)
-            except:
-                pass
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(input_pdf_path)
             input_pdf_path = modified_pdf_path
             logger.info("[pdf_annotator] Using modified PDF with blank page: %s", input_pdf_path)
 
@@ -631,13 +876,6 @@ def process_pdf_with_annotations(pdf_url: str, annotations: dict, output_dir: st
         add_annotations_to_pdf(input_pdf_path, annotations, output_pdf_path, add_margin)
         logger.info("[pdf_annotator] Annotated PDF saved to: %s", output_pdf_path)
 
-        # Clean up input file
-        try:
-            os.remove(input_pdf_path)
-            logger.debug("[pdf_annotator] Cleaned up input file")
-        except:
-            pass
-
         return {
             'status': 'success',
             'job_id': job_id,
@@ -657,4 +895,9 @@ def process_pdf_with_annotations(pdf_url: str, annotations: dict, output_dir: st
             'status': 'error',
             'message': f'Failed to process PDF: {str(e)}'
         }
-
+    finally:
+        # Clean up input file, on success and failure alike
+        if input_pdf_path is not None:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(input_pdf_path)
+                logger.debug("[pdf_annotator] Cleaned up input file")
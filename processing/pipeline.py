@@ -11,39 +11,393 @@ This module provides the full pipeline that:
 Equivalent to running: python run.py document.pdf
 """
 
+import concurrent.futures
+import io
 import json
+import logging
 import os
+import re
+import shutil
+import threading
+import time
 import requests
-import urllib3
 import fitz  # PyMuPDF
+from celery.exceptions import SoftTimeLimitExceeded
 from typing import Dict, Any, Tuple, Callable
 
-from .document_processor import DocumentProcessor, safe_json_loads
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is used otherwise
+    orjson = None
+
+try:
+    import fastjsonschema
+except ImportError:  # optional speedup; validation falls back to the field-by-field walk
+    fastjsonschema = None
+
+from .document_processor import DocumentProcessor, create_retry_session, safe_json_loads
 from .annotate_pdf import annotate_pdf_with_comments
 from .pdf_annotator import add_margins
 from .do_spaces import upload_to_spaces
+from . import process_pool
+from .tls import SSL_VERIFY
 
 # Import task logger for structured logging
 import sys
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from logger import get_task_logger, TaskLoggerAdapter
 
-# Suppress SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
 # External API configuration
 EXTERNAL_API_URL = "https://deep-evaluation.theiashub.com/api/mains-copies/update"
 EXTERNAL_API_MAX_RETRIES = 3
+EXTERNAL_API_RETRY_BACKOFF = 0.5  # seconds before the 2nd attempt, doubled after each failure
+
+
+
+def _create_external_api_session():
+    """
+    Keep-alive session for every external API call in this module.
+
+    Several calls per run go to the same host, so reusing the connection skips a
+    TLS handshake per call. GETs are retried with backoff by the adapter on
+    429/5xx, connection and read errors; PUTs are retried by _put_with_retries,
+    which retries any non-200 response and logs each failed attempt.
+    """
+    session = create_retry_session(
+        retries=EXTERNAL_API_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        pool_connections=4,
+        pool_maxsize=8,
+        allowed_methods=('GET',),
+    )
+    session.verify = SSL_VERIFY
+    return session
+
+
+_SESSION = _create_external_api_session()
+
+
+def reset_http_session():
+    """Replace the shared session (call in each forked worker so children don't share sockets)."""
+    global _SESSION
+    _SESSION = _create_external_api_session()
+
+# Write the external API payload to output_dir for curl/Postman debugging (off in production)
+DEBUG_PAYLOAD = os.environ.get('DEEP_EVAL_DEBUG_PAYLOAD', '0').lower() in ('1', 'true', 'yes')
+
+# Background threads for status PUTs whose results the pipeline does not wait on
+_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="external-api")
 
 # A4 page dimensions in points (72 points = 1 inch)
 A4_WIDTH = 595   # 8.27 inches
 A4_HEIGHT = 842  # 11.69 inches
 
 
+def json_dumps_bytes(obj, indent: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes, with orjson when available.
+
+    Args:
+        obj: JSON-serializable object
+        indent: Pretty-print with 2-space indentation
+
+    Returns:
+        JSON document as bytes, ready to write to a file (request bodies use json_dumps_wire)
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+
+    if indent:
+        return json.dumps(obj, indent=2).encode('utf-8')
+    return json.dumps(obj, ensure_ascii=True).encode('utf-8')
+
+
+def json_dumps_wire(obj) -> bytes:
+    """
+    Serialize obj for a request body to the external API.
+
+    Uses json.dumps with ensure_ascii=True and the default separators, so the body
+    is byte-identical to what requests sends for json=obj and to the payloads the
+    consumer has always received (non-ASCII characters stay \\uXXXX-escaped).
+
+    Args:
+        obj: JSON-serializable object
+
+    Returns:
+        ASCII-only JSON document as bytes
+    """
+    return json.dumps(obj, ensure_ascii=True).encode('ascii')
+
+
+# Fixed parts of the evaluation payload around the uid and the embedded evaluation JSON,
+# spaced like json.dumps so the body matches json_dumps_wire(payload) byte for byte
+_PAYLOAD_PREFIX = b'{"uid": '
+_PAYLOAD_MIDDLE = b', "data": {"status": "OCR Completed", "openai_response": "'
+_PAYLOAD_SUFFIX = b'"}}'
+
+
+def _as_json_string_body(json_bytes: bytes) -> bytes:
+    """
+    Escape JSON bytes for use between the quotes of a JSON string.
+
+    ASCII JSON from json_dumps_wire has no raw control characters (they are
+    escaped inside its strings), so only backslashes and quotes need escaping.
+    This gives the same bytes as serializing the decoded text again, without
+    decoding it or scanning it a second time in the JSON encoder.
+    """
+    return json_bytes.replace(b'\\', b'\\\\').replace(b'"', b'\\"')
+
+
+def _truncate(s, n: int):
+    """Return s cut to n characters (bytes for bytes), with '...' appended when cut."""
+    if len(s) <= n:
+        return s
+    return s[:n] + (b'...' if isinstance(s, bytes) else '...')
+
+
+def _call_status(success: bool, message: str) -> str:
+    """Summary wording for an API call: Success, Failed - <message>, or just the message when it was not attempted (None)."""
+    if success:
+        return "Success"
+    return message if success is None else f"Failed - {message}"
+
+
+def _log_pipeline_summary(log, ocr_output_path: str, evaluation_output_path: str,
+                          annotated_pdf_path: str, annotated_pdf_url: str,
+                          verified_copy_api_success: bool, external_api_success: bool,
+                          external_api_message: str, process_api_success: bool,
+                          process_api_message: str, is_new_summary_page_added_at_start: bool):
+    """Log the end-of-pipeline summary (callers check the INFO level first)."""
+    if not external_api_success and process_api_success is False:
+        process_api_message = "Skipped"
+        process_api_success = None
+
+    log.info("=" * 60)
+    log.info("✅ PIPELINE COMPLETE!")
+    log.info("=" * 60)
+    log.info("   OCR Output:      %s", ocr_output_path)
+    log.info("   Evaluation:      %s", evaluation_output_path)
+    if annotated_pdf_path:
+        log.info("   Annotated PDF:   %s", annotated_pdf_path)
+    if annotated_pdf_url:
+        log.info("   Annotated URL:   %s", annotated_pdf_url)
+    log.info("   Verified Copy:   %s", "Success" if verified_copy_api_success else "Failed")
+    log.info("   External API:    %s", _call_status(bool(external_api_success), external_api_message))
+    log.info("   Process API:     %s", _call_status(process_api_success, process_api_message))
+    log.info("   New Summary Page Added at Start: %s", is_new_summary_page_added_at_start)
+
+
+def _put_with_retries(url: str, data: bytes, headers: Dict[str, str], timeout: int, log,
+                      attempts: int = EXTERNAL_API_MAX_RETRIES) -> Tuple[requests.Response, str]:
+    """
+    PUT with the shared session, retrying any non-200 response, timeout or request error.
+
+    Every failed attempt is logged.
+
+    Args:
+        url: Request URL
+        data: Request body
+        headers: Request headers
+        timeout: Per-attempt timeout in seconds
+        log: Logger with task context
+        attempts: Maximum number of attempts
+
+    Returns:
+        Tuple of (last response, or None if no response was received; None on
+        success, otherwise the last error message)
+    """
+    response = None
+    last_error = None
+    for attempt in range(1, attempts + 1):
+        try:
+            response = _SESSION.put(url, data=data, headers=headers, timeout=timeout)
+            if response.status_code == 200:
+                return response, None
+            last_error = f"HTTP {response.status_code}: {_truncate(response.text, 500)}"
+        except requests.exceptions.Timeout as e:
+            response = None
+            last_error = f"Timeout: {str(e)}"
+        except requests.exceptions.RequestException as e:
+            response = None
+            last_error = f"Request error: {str(e)}"
+
+        log.warning("⚠️ PUT %s failed (attempt %d/%d): %s", url, attempt, attempts, last_error)
+        if attempt < attempts:
+            time.sleep(EXTERNAL_API_RETRY_BACKOFF * 2 ** (attempt - 1))
+
+    return response, last_error
+
+
+def _do_put(url: str, payload: Dict[str, Any], log, timeout: int = 30) -> int:
+    """
+    PUT a JSON payload with retries and return the final HTTP status code.
+
+    Raises:
+        requests.RequestException: If no attempt got a response
+    """
+    response, last_error = _put_with_retries(
+        url, json_dumps_wire(payload), {'Content-Type': 'application/json'}, timeout, log
+    )
+    if response is None:
+        raise requests.RequestException(last_error)
+    return response.status_code
+
+
+def _upload_and_update_copy(pdf_path: str, destination_path: str, uid: str,
+                            is_summary_extra_page_inserted: bool, log) -> int:
+    """
+    Upload the margin-added PDF to DO Spaces, then send one PUT carrying both
+    is_summary_extra_page_inserted and resized_copy_url.
+
+    If the upload fails, the summary flag is still sent on its own.
+
+    Args:
+        pdf_path: Local PDF with margins
+        destination_path: Key in the bucket
+        uid: The unique identifier for the mains copy
+        is_summary_extra_page_inserted: Whether a new summary page was added at the start
+        log: Logger with task context
+
+    Returns:
+        HTTP status code of the PUT
+    """
+    data = {"is_summary_extra_page_inserted": is_summary_extra_page_inserted}
+
+    upload_result = upload_to_spaces(pdf_path, destination_path)
+    if upload_result['status'] == 'success':
+        data["resized_copy_url"] = upload_result.get('public_url')
+        log.info("✅ Upload successful. Public URL: %s", data["resized_copy_url"])
+    else:
+        log.warning("⚠️ Upload to DO Spaces failed: %s", upload_result.get('message'))
+
+    return _do_put(EXTERNAL_API_URL, {"uid": str(uid), "data": data}, log)
+
+
+def _upload_verified_copy(pdf_path: str, destination_path: str, uid: str, log) -> Tuple[str, bool]:
+    """
+    Upload the annotated PDF to DO Spaces, then PUT its URL as verified_copy.
+
+    Args:
+        pdf_path: Local annotated PDF
+        destination_path: Key in the bucket
+        uid: The unique identifier for the mains copy
+        log: Logger with task context
+
+    Returns:
+        Tuple of (public URL or None if the upload failed, whether the PUT succeeded)
+    """
+    upload_result = upload_to_spaces(pdf_path, destination_path)
+    if upload_result['status'] != 'success':
+        log.warning("⚠️ Upload annotated PDF to DO Spaces failed: %s", upload_result.get('message'))
+        return None, False
+
+    annotated_pdf_url = upload_result.get('public_url')
+    log.info("✅ Annotated PDF upload successful. Public URL: %s", annotated_pdf_url)
+
+    # Call external API to update with verified_copy
+    log.info("Calling external API with verified_copy...")
+    try:
+        status_code = _do_put(EXTERNAL_API_URL, {
+            "uid": str(uid),
+            "data": {
+                "verified_copy": annotated_pdf_url
+            }
+        }, log)
+    except Exception as e:
+        log.warning("⚠️ External API call for verified_copy failed: %s", str(e))
+        return annotated_pdf_url, False
+
+    if status_code == 200:
+        log.info("✅ External API call successful for verified_copy")
+        return annotated_pdf_url, True
+
+    log.warning("⚠️ External API call for verified_copy failed with status: %d", status_code)
+    return annotated_pdf_url, False
+
+
+def _collect_background_puts(pending, log, timeout: int = 30) -> None:
+    """
+    Wait for background PUTs started with _EXECUTOR and log how each one went.
+
+    Args:
+        pending: List of (label, future) pairs; each future returns an HTTP status code
+        log: Logger with task context
+        timeout: Seconds to wait for all of them together
+    """
+    if not pending:
+        return
+
+    done, _ = concurrent.futures.wait([future for _, future in pending], timeout=timeout)
+    for label, future in pending:
+        if future not in done:
+            log.warning("⚠️ External API call for %s did not finish within %ds", label, timeout)
+            continue
+        try:
+            status_code = future.result()
+        except Exception as e:
+            log.warning("⚠️ External API call for %s failed: %s", label, str(e))
+            continue
+        if status_code == 200:
+            log.info("✅ External API call successful for %s", label)
+        else:
+            log.warning("⚠️ External API call for %s failed with status: %d", label, status_code)
+
+
+_BLANK_A4 = None
+_BLANK_A4_LOCK = threading.Lock()
+
+
+def _blank_a4_template():
+    """One-page blank A4 document, built once per process and copied into PDFs."""
+    global _BLANK_A4
+
+    if _BLANK_A4 is None:
+        template = fitz.open()
+        template.new_page(width=A4_WIDTH, height=A4_HEIGHT)
+        _BLANK_A4 = template
+    return _BLANK_A4
+
+
+def _insert_blank_page_file(pdf_path: str, insert_index: int, output_path: str) -> Tuple[int, int]:
+    """
+    Insert a blank A4 page into a PDF file (module-level so it can run in the process pool).
+
+    Returns:
+        Tuple of (index actually used, total page count)
+    """
+    with fitz.open(pdf_path) as doc:
+        # Ensure insert_index is within valid range
+        insert_index = max(0, min(insert_index, len(doc)))
+
+        # Copy the cached blank A4 page in at the specified position. PyMuPDF
+        # documents aren't thread-safe, so the shared template is used under a lock.
+        with _BLANK_A4_LOCK:
+            doc.insert_pdf(_blank_a4_template(), from_page=0, to_page=0, start_at=insert_index)
+
+        # Nothing was removed, so skip the garbage-collection pass
+        doc.save(output_path, garbage=0, deflate=True)
+        return insert_index, len(doc)
+
+
+def _save_with_margins(pdf_path: str, output_path: str, right_margin_inches: float,
+                       bottom_margin_inches: float) -> None:
+    """Write a copy of pdf_path with margins added (module-level so it can run in the process pool)."""
+    with fitz.open(pdf_path) as doc:
+        add_margins(doc, right_margin_inches=right_margin_inches, bottom_margin_inches=bottom_margin_inches)
+        doc.save(output_path)
+
+
 def insert_blank_page_in_pdf(pdf_path: str, position: int, output_path: str, log) -> str:
     """
     Insert a blank A4 page at the specified position in the PDF.
 
+    The PyMuPDF work runs in the shared process pool so concurrent pipeline
+    runs don't serialize on the GIL (inline where the pool is unavailable).
+
     Args:
         pdf_path: Path to the input PDF
         position: Page number where to insert (1-based).
@@ -57,32 +411,24 @@ def insert_blank_page_in_pdf(pdf_path: str, position: int, output_path: str, log
     """
     log.info("Inserting blank A4 page at position %d", position)
 
-    doc = fitz.open(pdf_path)
-
     # Convert 1-based position to 0-based index for insertion
     # Position 1 -> insert at index 0 (before first page)
     # Position 3 -> insert at index 2 (after second page, before third)
-    insert_index = position - 1
-
-    # Ensure insert_index is within valid range
-    if insert_index < 0:
-        insert_index = 0
-    elif insert_index > len(doc):
-        insert_index = len(doc)
-
-    # Insert a new blank A4 page at the specified position
-    doc.insert_page(insert_index, width=A4_WIDTH, height=A4_HEIGHT)
+    insert_index, page_count = process_pool.run_in_process(
+        _insert_blank_page_file, pdf_path, position - 1, output_path
+    )
 
     log.info("✅ Blank page inserted at position %d (index %d). Total pages: %d",
-             position, insert_index, len(doc))
-
-    # Save the modified PDF
-    doc.save(output_path)
-    doc.close()
+             position, insert_index, page_count)
 
     return output_path
 
 
+# Control characters dropped by sanitize_for_json: C0 (except tab, newline,
+# carriage return), DEL and C1
+_CTRL_RE = re.compile('[\\x00-\\x08\\x0b\\x0c\\x0e-\\x1f\\x7f-\\x9f]')
+
+
 def sanitize_for_json(text: str) -> str:
     """
     Sanitize text for JSON by removing or replacing problematic characters.
@@ -95,35 +441,50 @@ def sanitize_for_json(text: str) -> str:
     if not isinstance(text, str):
         return text
 
-    # Remove control characters except \n, \r, \t
-    # Control characters are in ranges 0x00-0x1F and 0x7F-0x9F
-    cleaned = ""
-    for char in text:
-        code = ord(char)
-        # Keep printable ASCII, newlines, tabs, and valid Unicode
-        if code == 0x09 or code == 0x0A or code == 0x0D:  # tab, newline, carriage return
-            cleaned += char
-        elif code >= 0x20 and code <= 0x7E:  # printable ASCII
-            cleaned += char
-        elif code >= 0xA0:  # Valid Unicode (non-control)
-            cleaned += char
-        # else: skip control characters
-
-    return cleaned
+    # Most strings are already clean: a search avoids building a copy for them
+    if not _CTRL_RE.search(text):
+        return text
+    return _CTRL_RE.sub('', text)
 
 
 def sanitize_evaluation(evaluation: dict) -> dict:
     """
-    Recursively sanitize all string values in the evaluation dictionary.
+    Sanitize all string values in the evaluation dictionary.
+
+    Containers are cleaned in place with an explicit stack (no recursion), and
+    only strings that actually contain control characters are replaced.
+
+    Args:
+        evaluation: Parsed evaluation (dict, list or scalar)
+
+    Returns:
+        The same object, cleaned (a new string if evaluation itself is a string)
     """
-    if isinstance(evaluation, dict):
-        return {k: sanitize_evaluation(v) for k, v in evaluation.items()}
-    elif isinstance(evaluation, list):
-        return [sanitize_evaluation(item) for item in evaluation]
-    elif isinstance(evaluation, str):
+    if isinstance(evaluation, str):
         return sanitize_for_json(evaluation)
-    else:
-        return evaluation
+
+    stack = [evaluation]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+
+        dirty = []
+        for key, value in items:
+            if type(value) is str:
+                if _CTRL_RE.search(value):
+                    dirty.append((key, value))
+            elif isinstance(value, (dict, list)):
+                stack.append(value)
+        # Assign after iterating so the dict is not modified mid-iteration
+        for key, value in dirty:
+            node[key] = _CTRL_RE.sub('', value)
+
+    return evaluation
 
 
 def send_evaluation_to_external_api(
@@ -135,13 +496,14 @@ def send_evaluation_to_external_api(
     """
     Send the OpenAI evaluation result to the external API.
 
-    Retries up to 3 times and checks for 200 OK response.
+    Any non-200 response, timeout or request error is retried (see _put_with_retries);
+    succeeds on 200 OK.
 
     Args:
         uid: The unique identifier for the mains copy
         evaluation: The OpenAI evaluation result dictionary
         log: Logger with task context
-        output_dir: Optional directory to save debug payload
+        output_dir: Optional directory to save debug payload (when DEEP_EVAL_DEBUG_PAYLOAD=1)
 
     Returns:
         Tuple of (success: bool, message: str)
@@ -150,99 +512,79 @@ def send_evaluation_to_external_api(
     evaluation = sanitize_evaluation(evaluation)
     log.info("Sanitized evaluation to remove control characters")
 
-    # Convert evaluation to JSON string with ensure_ascii=True for maximum compatibility
-    # This escapes all non-ASCII characters as \uXXXX sequences
-    openai_response_str = json.dumps(evaluation, ensure_ascii=True)
+    # Serialize the evaluation once; the API expects it as a string value inside the payload
+    openai_response_bytes = json_dumps_wire(evaluation)
 
-    # Build payload with openai_response as a string value
-    payload = {
-        "uid": str(uid),  # Ensure uid is a string
-        "data": {
-            "status": "OCR Completed",  # Status to indicate OCR processing is done
-            "openai_response": openai_response_str  # String value, not object
-        }
-    }
+    # Build payload with openai_response as a string value:
+    # {"uid": "<uid>", "data": {"status": "OCR Completed", "openai_response": "<evaluation JSON>"}}
+    payload_bytes = (
+        _PAYLOAD_PREFIX + json_dumps_wire(str(uid))
+        + _PAYLOAD_MIDDLE + _as_json_string_body(openai_response_bytes)
+        + _PAYLOAD_SUFFIX
+    )
+    payload_size = len(payload_bytes)
 
     headers = {
         "Content-Type": "application/json"
     }
 
-    # Serialize the full payload to JSON with ensure_ascii=True for maximum compatibility
-    payload_json = json.dumps(payload, ensure_ascii=True)
-    payload_size = len(payload_json.encode('utf-8'))
-
     # Save payload to file for debugging (so you can test with curl/Postman)
-    if output_dir:
+    if output_dir and DEBUG_PAYLOAD:
         debug_payload_path = os.path.join(output_dir, f"debug_external_api_payload_{uid}.json")
         try:
-            with open(debug_payload_path, 'w') as f:
-                f.write(payload_json)
+            # One unbuffered write of the ready-made bytes
+            fd = os.open(debug_payload_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                view = memoryview(payload_bytes)
+                while view:
+                    view = view[os.write(fd, view):]
+            finally:
+                os.close(fd)
             log.info("Debug payload saved to: %s", debug_payload_path)
         except Exception as e:
             log.warning("Could not save debug payload: %s", e)
 
-    log.info("=" * 60)
-    log.info("EXTERNAL API REQUEST DETAILS:")
-    log.info("  URL: %s", EXTERNAL_API_URL)
-    log.info("  Method: PUT")
-    log.info("  Headers: %s", headers)
-    log.info("  Payload structure: {uid: '%s', data: {status: 'OCR Completed', openai_response: '<string with %d chars>'}}",
-             uid, len(openai_response_str))
-    log.info("  Total payload size: %d bytes", payload_size)
-    log.info("  Full payload (first 1000 chars): %s", payload_json[:1000])
-    if payload_size > 1000:
-        log.info("  ... (truncated, full size: %d bytes)", payload_size)
-    log.info("=" * 60)
-
-    last_error = None
-
-    for attempt in range(1, EXTERNAL_API_MAX_RETRIES + 1):
-        try:
-            log.info("Sending PUT request to external API (attempt %d/%d)...",
-                    attempt, EXTERNAL_API_MAX_RETRIES)
-
-            # Encode payload as UTF-8 bytes to ensure proper encoding
-            payload_bytes = payload_json.encode('utf-8')
+    # The request details build slices and copies; skip them when INFO is filtered out
+    info_enabled = log.isEnabledFor(logging.INFO)
+    if info_enabled:
+        log.info("=" * 60)
+        log.info("EXTERNAL API REQUEST DETAILS:")
+        log.info("  URL: %s", EXTERNAL_API_URL)
+        log.info("  Method: PUT")
+        log.info("  Headers: %s", headers)
+        log.info("  Payload structure: {uid: '%s', data: {status: 'OCR Completed', openai_response: '<string with %d bytes>'}}",
+                 uid, len(openai_response_bytes))
+        log.info("  Total payload size: %d bytes", payload_size)
+        log.info("  Full payload (first 1000 bytes): %s",
+                 _truncate(payload_bytes, 1000).decode('utf-8', errors='replace'))
+        log.info("=" * 60)
 
-            # Use explicit charset in Content-Type header
-            request_headers = {
-                "Content-Type": "application/json; charset=utf-8"
-            }
+    log.info("Sending PUT request to external API (up to %d attempts)...", EXTERNAL_API_MAX_RETRIES)
 
-            response = requests.put(
-                EXTERNAL_API_URL,
-                data=payload_bytes,  # Send as UTF-8 encoded bytes
-                headers=request_headers,
-                timeout=60,
-                verify=False
-            )
+    # Use explicit charset in Content-Type header
+    request_headers = {
+        "Content-Type": "application/json; charset=utf-8"
+    }
 
-            log.info("Response status code: %d", response.status_code)
+    response, last_error = _put_with_retries(
+        EXTERNAL_API_URL,
+        payload_bytes,  # Send as UTF-8 encoded bytes
+        request_headers,
+        60,
+        log,
+    )
+
+    if last_error is None:
+        log.info("Response status code: %d", response.status_code)
+        if info_enabled:
             log.info("Response headers: %s", dict(response.headers))
+        log.info("✅ Successfully sent evaluation to external API (uid: %s)", uid)
+        if info_enabled:
+            log.info("Response body: %s", _truncate(response.text, 500) or "(empty)")
+        return True, "Success"
 
-            if response.status_code == 200:
-                log.info("✅ Successfully sent evaluation to external API (uid: %s)", uid)
-                log.info("Response body: %s", response.text[:500] if response.text else "(empty)")
-                return True, "Success"
-            else:
-                last_error = f"HTTP {response.status_code}: {response.text[:500]}"
-                log.warning("⚠️ External API returned status %d (attempt %d/%d): %s",
-                           response.status_code, attempt, EXTERNAL_API_MAX_RETRIES,
-                           response.text[:500])
-
-        except requests.exceptions.Timeout as e:
-            last_error = f"Timeout: {str(e)}"
-            log.warning("⚠️ External API timeout (attempt %d/%d): %s",
-                       attempt, EXTERNAL_API_MAX_RETRIES, str(e))
-
-        except requests.exceptions.RequestException as e:
-            last_error = f"Request error: {str(e)}"
-            log.warning("⚠️ External API request failed (attempt %d/%d): %s",
-                       attempt, EXTERNAL_API_MAX_RETRIES, str(e))
-
-    # All retries exhausted
     log.error("❌ Failed to send evaluation to external API after %d attempts. Last error: %s",
-             EXTERNAL_API_MAX_RETRIES, last_error)
+              EXTERNAL_API_MAX_RETRIES, last_error)
     return False, last_error
 
 
@@ -268,22 +610,22 @@ def trigger_process_api(log: TaskLoggerAdapter) -> Tuple[bool, str]:
     log.info("=" * 60)
 
     try:
-        response = requests.get(
+        response = _SESSION.get(
             process_url,
-            timeout=30,
-            verify=False
+            timeout=30
         )
 
         log.info("Process API response status: %d", response.status_code)
 
         if response.status_code == 200:
             log.info("✅ Process API triggered successfully")
-            log.info("Response: %s", response.text[:500] if response.text else "(empty)")
+            if log.isEnabledFor(logging.INFO):
+                log.info("Response: %s", _truncate(response.text, 500) or "(empty)")
             return True, "Success"
         else:
-            error_msg = f"HTTP {response.status_code}: {response.text[:500]}"
-            log.warning("⚠️ Process API returned status %d: %s",
-                       response.status_code, response.text[:500])
+            body = _truncate(response.text, 500)
+            error_msg = f"HTTP {response.status_code}: {body}"
+            log.warning("⚠️ Process API returned status %d: %s", response.status_code, body)
             return False, error_msg
 
     except requests.exceptions.Timeout as e:
@@ -329,28 +671,83 @@ def extract_text_from_ocr(ocr_data) -> str:
     # Normalize the data first
     ocr_data = normalize_ocr_data(ocr_data)
 
-    text_parts = []
-    for page in ocr_data.get("Pages", []):
-        for block in page.get("Blocks", []):
-            for line in block.get("Lines", []):
-                text = line.get("text", "")
+    # Write lines straight into one buffer instead of collecting them for a join
+    buf = io.StringIO()
+    for page in ocr_data.get("Pages", ()):
+        for block in page.get("Blocks", ()):
+            for line in block.get("Lines", ()):
+                text = line.get("text")
                 if text:
-                    text_parts.append(text)
-    return "\n".join(text_parts)
+                    if buf.tell():
+                        buf.write("\n")
+                    buf.write(text)
+    return buf.getvalue()
+
+
+_COMMENT_SCHEMA = {
+    "type": "object",
+    "required": ["page", "coordinates"],
+    "properties": {"coordinates": {"type": "array", "minItems": 4, "maxItems": 4}},
+}
+
+# Schema for the common (valid) case. It is at least as strict as the checks in
+# _collect_evaluation_errors, so a document passing it has no errors there.
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "required": ["Questions", "OverallSummary"],
+    "properties": {
+        "Questions": {
+            "type": "object",
+            "additionalProperties": {
+                "type": "object",
+                "required": ["Score", "Sub-part Coverage", "Comments", "HygieneSummary", "Summary"],
+                "properties": {
+                    "Comments": {
+                        "type": "object",
+                        "required": ["Introduction", "Body", "Conclusion"],
+                        "properties": {
+                            section: {"type": "array", "items": _COMMENT_SCHEMA}
+                            for section in ("Introduction", "Body", "Conclusion")
+                        },
+                    },
+                },
+            },
+        },
+        "OverallSummary": {"type": "array", "minItems": 1},
+    },
+}
+
+_validate_evaluation_schema = fastjsonschema.compile(EVALUATION_SCHEMA) if fastjsonschema is not None else None
 
 
 def validate_evaluation_json(evaluation: dict) -> Tuple[bool, list]:
     """
     Validate that the evaluation JSON has all required fields.
 
+    A compiled schema check (when fastjsonschema is installed) accepts valid
+    documents in one call; detailed messages are only built when it fails.
+
     Returns:
         Tuple of (is_valid, list of error messages)
     """
+    if _validate_evaluation_schema is not None:
+        try:
+            _validate_evaluation_schema(evaluation)
+            return True, []
+        except fastjsonschema.JsonSchemaException:
+            pass
+
+    errors = _collect_evaluation_errors(evaluation)
+    return len(errors) == 0, errors
+
+
+def _collect_evaluation_errors(evaluation: dict) -> list:
+    """Walk the evaluation field by field and describe everything that is missing or malformed."""
     errors = []
 
     if not isinstance(evaluation, dict):
         errors.append("Evaluation is not a valid JSON object")
-        return False, errors
+        return errors
 
     if "Questions" not in evaluation:
         errors.append("Missing 'Questions' in evaluation")
@@ -402,8 +799,7 @@ def validate_evaluation_json(evaluation: dict) -> Tuple[bool, list]:
     elif len(evaluation["OverallSummary"]) == 0:
         errors.append("'OverallSummary' is empty")
 
-    is_valid = len(errors) == 0
-    return is_valid, errors
+    return errors
 
 
 def run_full_pipeline(
@@ -419,6 +815,7 @@ def run_full_pipeline(
     openai_assistant_id: str,
     progress_callback: Callable[[int, str], None] = None,
     model_answer_url: str = None,
+    process_api_trigger: Callable[[], None] = None,
 ) -> Dict[str, Any]:
     """
     Run the full document processing pipeline.
@@ -444,6 +841,8 @@ def run_full_pipeline(
         openai_assistant_id: OpenAI Assistant ID
         progress_callback: Optional callback for progress updates (progress, step)
         model_answer_url: Optional URL to model answer PDF for comparison
+        process_api_trigger: Optional callable that queues the process API call
+                             (e.g. as a Celery task) instead of calling it inline
 
     Returns:
         Dictionary with result details:
@@ -474,6 +873,10 @@ def run_full_pipeline(
     # Initialize tracking variable for Case 2 (new blank page inserted at start)
     is_new_summary_page_added_at_start = False
 
+    # Outputs written by this run (reported on failure without stat() calls,
+    # and without picking up stale files from an earlier attempt)
+    written_outputs = set()
+
     try:
         # Initialize processor
         processor = DocumentProcessor(
@@ -493,15 +896,23 @@ def run_full_pipeline(
         log.info("STEP 1: OCR with Gemini")
         log.info("=" * 60)
 
-        ocr_result, metadata = processor.extract_text(pdf_path)
+        ocr_result, ocr_data, metadata = processor.extract_ocr_chunked(pdf_path)
 
         # Save OCR result with UTF-8 encoding to preserve Devanagari text
         with open(ocr_output_path, "w", encoding="utf-8") as f:
             f.write(ocr_result)
+        written_outputs.add(ocr_output_path)
 
         log.info("✅ OCR Output saved to: %s", ocr_output_path)
         log.info("📄 Processed %d page(s)", len(metadata))
 
+        # The processor returns the parsed result when it built one; otherwise parse
+        # the string once (safe parser handles Gemini JSON errors). Reused for
+        # empty-page detection, evaluation and annotation.
+        if ocr_data is None:
+            ocr_data = safe_json_loads(ocr_result)
+        ocr_data = normalize_ocr_data(ocr_data)
+
         update_progress(35, "ocr_completed")
 
         # ==============================================================
@@ -512,12 +923,8 @@ def run_full_pipeline(
         log.info("STEP 1b: Checking Empty Page Detection")
         log.info("=" * 60)
 
-        # Parse OCR result to check empty_page_detection
-        ocr_data_for_detection = safe_json_loads(ocr_result)
-        ocr_data_for_detection = normalize_ocr_data(ocr_data_for_detection)
-
         # Check for empty_page_detection in OCR response
-        empty_page_detection = ocr_data_for_detection.get("empty_page_detection", {})
+        empty_page_detection = ocr_data.get("empty_page_detection", {})
         insert_blank_page = empty_page_detection.get("insert_blank_page", False)
         blank_page_position = empty_page_detection.get("blank_page_position")
         case_applied = empty_page_detection.get("case_applied", 0)
@@ -538,32 +945,10 @@ def run_full_pipeline(
         log.info("  Summary page position: %s", summary_page_position)
         log.info("  Is new summary page added at start: %s", is_new_summary_page_added_at_start)
 
-        # ==============================================================
-        # Send is_summary_extra_page_inserted to External API
-        # ==============================================================
-        log.info("Sending is_summary_extra_page_inserted to external API...")
-        try:
-            summary_page_payload = {
-                "uid": str(uid),
-                "data": {
-                    "is_summary_extra_page_inserted": is_new_summary_page_added_at_start
-                }
-            }
-
-            summary_page_response = requests.put(
-                EXTERNAL_API_URL,
-                json=summary_page_payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=30,
-                verify=False
-            )
-
-            if summary_page_response.status_code == 200:
-                log.info("✅ External API call successful for is_summary_extra_page_inserted: %s", is_new_summary_page_added_at_start)
-            else:
-                log.warning("⚠️ External API call for is_summary_extra_page_inserted failed with status: %d", summary_page_response.status_code)
-        except Exception as e:
-            log.warning("⚠️ External API call for is_summary_extra_page_inserted failed: %s", str(e))
+        # is_summary_extra_page_inserted is sent together with resized_copy_url
+        # after the step 1c upload. That update does not feed into the evaluation,
+        # so it runs in the background and is collected once the evaluator returns.
+        pending_puts = []
 
         # PDF path for annotations (may be modified if blank page is inserted)
         pdf_for_annotation = pdf_path
@@ -597,48 +982,18 @@ def run_full_pipeline(
 
             # Open the blank page PDF, add margins, and save
             log.info("Adding right margin (2.5 inches) and bottom margin (1 inch)...")
-            margin_doc = fitz.open(pdf_for_annotation)
-            add_margins(margin_doc, right_margin_inches=2.5, bottom_margin_inches=1.0)
-            margin_doc.save(pdf_with_margins_path)
-            margin_doc.close()
+            process_pool.run_in_process(_save_with_margins, pdf_for_annotation, pdf_with_margins_path, 2.5, 1.0)
             log.info("✅ Margins added. Saved to: %s", pdf_with_margins_path)
 
             # Upload to DO Spaces
             destination_path = f"blank-page-pdfs/{uid}_{task_id}_with_blank_page.pdf"
-            log.info("Uploading to DO Spaces: %s", destination_path)
-
-            upload_result = upload_to_spaces(pdf_with_margins_path, destination_path)
-
-            if upload_result['status'] == 'success':
-                blank_page_pdf_url = upload_result.get('public_url')
-                log.info("✅ Upload successful. Public URL: %s", blank_page_pdf_url)
-
-                # Call external API to update with resized_copy_url
-                log.info("Calling external API with resized_copy_url...")
-                try:
-                    external_payload = {
-                        "uid": str(uid),
-                        "data": {
-                            "resized_copy_url": blank_page_pdf_url
-                        }
-                    }
-
-                    external_response = requests.put(
-                        EXTERNAL_API_URL,
-                        json=external_payload,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=30,
-                        verify=False
-                    )
-
-                    if external_response.status_code == 200:
-                        log.info("✅ External API call successful for resized_copy_url")
-                    else:
-                        log.warning("⚠️ External API call failed with status: %d", external_response.status_code)
-                except Exception as e:
-                    log.warning("⚠️ External API call failed: %s", str(e))
-            else:
-                log.warning("⚠️ Upload to DO Spaces failed: %s", upload_result.get('message'))
+            # Upload, then send one update with the URL and summary flag, while evaluation runs
+            log.info("Uploading to DO Spaces (in background): %s", destination_path)
+            pending_puts.append((
+                f"resized_copy_url + is_summary_extra_page_inserted={is_new_summary_page_added_at_start}",
+                _EXECUTOR.submit(_upload_and_update_copy, pdf_with_margins_path, destination_path, uid,
+                                 is_new_summary_page_added_at_start, log)
+            ))
         else:
             log.info("ℹ️ No blank page insertion needed")
 
@@ -655,48 +1010,18 @@ def run_full_pipeline(
 
             # Open the original PDF, add margins, and save
             log.info("Adding right margin (2.5 inches) and bottom margin (1 inch)...")
-            margin_doc = fitz.open(pdf_path)
-            add_margins(margin_doc, right_margin_inches=2.5, bottom_margin_inches=1.0)
-            margin_doc.save(pdf_with_margins_path)
-            margin_doc.close()
+            process_pool.run_in_process(_save_with_margins, pdf_path, pdf_with_margins_path, 2.5, 1.0)
             log.info("✅ Margins added. Saved to: %s", pdf_with_margins_path)
 
             # Upload to DO Spaces
             destination_path = f"blank-page-pdfs/{uid}_{task_id}_with_margins.pdf"
-            log.info("Uploading to DO Spaces: %s", destination_path)
-
-            upload_result = upload_to_spaces(pdf_with_margins_path, destination_path)
-
-            if upload_result['status'] == 'success':
-                resized_pdf_url = upload_result.get('public_url')
-                log.info("✅ Upload successful. Public URL: %s", resized_pdf_url)
-
-                # Call external API to update with resized_copy_url
-                log.info("Calling external API with resized_copy_url...")
-                try:
-                    external_payload = {
-                        "uid": str(uid),
-                        "data": {
-                            "resized_copy_url": resized_pdf_url
-                        }
-                    }
-
-                    external_response = requests.put(
-                        EXTERNAL_API_URL,
-                        json=external_payload,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=30,
-                        verify=False
-                    )
-
-                    if external_response.status_code == 200:
-                        log.info("✅ External API call successful for resized_copy_url")
-                    else:
-                        log.warning("⚠️ External API call failed with status: %d", external_response.status_code)
-                except Exception as e:
-                    log.warning("⚠️ External API call failed: %s", str(e))
-            else:
-                log.warning("⚠️ Upload to DO Spaces failed: %s", upload_result.get('message'))
+            # Upload, then send one update with the URL and summary flag, while evaluation runs
+            log.info("Uploading to DO Spaces (in background): %s", destination_path)
+            pending_puts.append((
+                f"resized_copy_url + is_summary_extra_page_inserted={is_new_summary_page_added_at_start}",
+                _EXECUTOR.submit(_upload_and_update_copy, pdf_with_margins_path, destination_path, uid,
+                                 is_new_summary_page_added_at_start, log)
+            ))
 
         update_progress(44, "blank_page_check_completed")
 
@@ -708,10 +1033,6 @@ def run_full_pipeline(
         log.info("STEP 2: Evaluation with OpenAI")
         log.info("=" * 60)
 
-        # Parse OCR result (using safe parser to handle Gemini JSON errors)
-        ocr_data = safe_json_loads(ocr_result)
-        # Normalize OCR data (handle list vs dict formats from Gemini)
-        ocr_data = normalize_ocr_data(ocr_data)
         student_text = extract_text_from_ocr(ocr_data)
         student_coords = ocr_result  # Full JSON with coordinates
 
@@ -723,16 +1044,18 @@ def run_full_pipeline(
             log.info("Model answer URL provided: %s", model_answer_url[:100] + "..." if len(model_answer_url) > 100 else model_answer_url)
             try:
                 import tempfile
-                model_answer_response = requests.get(model_answer_url, stream=True, timeout=120, verify=False)
-                model_answer_response.raise_for_status()
+                with _SESSION.get(model_answer_url, stream=True, timeout=120) as model_answer_response:
+                    model_answer_response.raise_for_status()
 
-                # Save to temp file
-                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
-                    for chunk in model_answer_response.iter_content(chunk_size=8192):
-                        tmp_file.write(chunk)
-                    model_answer_pdf_path = tmp_file.name
+                    # Save to temp file (1 MB blocks copied in C)
+                    model_answer_response.raw.decode_content = True
+                    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as tmp_file:
+                        shutil.copyfileobj(model_answer_response.raw, tmp_file, length=1024 * 1024)
+                        model_answer_pdf_path = tmp_file.name
 
                 log.info("✅ Model answer PDF downloaded to: %s", model_answer_pdf_path)
+            except SoftTimeLimitExceeded:
+                raise
             except Exception as e:
                 log.warning("⚠️ Failed to download model answer PDF: %s. Using self-evaluation mode.", str(e))
                 model_answer_pdf_path = None
@@ -746,6 +1069,9 @@ def run_full_pipeline(
             model_answer_pdf_path=model_answer_pdf_path,  # PDF takes precedence
         )
 
+        # The resized copy upload can outlast the evaluation: allow it more time
+        _collect_background_puts(pending_puts, log, timeout=120)
+
         # Clean up temp model answer PDF
         if model_answer_pdf_path:
             try:
@@ -755,8 +1081,9 @@ def run_full_pipeline(
                 pass
 
         # Save evaluation result
-        with open(evaluation_output_path, "w") as f:
-            json.dump(evaluation, f, indent=2)
+        with open(evaluation_output_path, "wb") as f:
+            f.write(json_dumps_bytes(evaluation, indent=True))
+        written_outputs.add(evaluation_output_path)
 
         log.info("✅ Evaluation saved to: %s", evaluation_output_path)
 
@@ -802,6 +1129,8 @@ def run_full_pipeline(
                 is_existing_page_for_summary=is_existing_page_for_summary  # Whether to place after existing content
             )
             log.info("✅ Annotated PDF saved to: %s", annotated_pdf_path)
+        except SoftTimeLimitExceeded:
+            raise
         except Exception as e:
             log.warning("⚠️ Warning: Could not create annotated PDF: %s", e)
             annotated_pdf_path = None
@@ -813,6 +1142,7 @@ def run_full_pipeline(
         # ==============================================================
         annotated_pdf_url = None
         verified_copy_api_success = False
+        verified_copy_future = None
 
         if annotated_pdf_path and os.path.exists(annotated_pdf_path):
             update_progress(87, "uploading_annotated_pdf")
@@ -820,43 +1150,13 @@ def run_full_pipeline(
             log.info("STEP 3b: Uploading Annotated PDF to DO Spaces")
             log.info("=" * 60)
 
-            # Upload to DO Spaces
+            # Upload and update verified_copy in the background, overlapping STEP 4;
+            # it is awaited before the process API is triggered
             annotated_destination_path = f"annotated-pdfs/{uid}_{task_id}_annotated.pdf"
-            log.info("Uploading annotated PDF to DO Spaces: %s", annotated_destination_path)
-
-            annotated_upload_result = upload_to_spaces(annotated_pdf_path, annotated_destination_path)
-
-            if annotated_upload_result['status'] == 'success':
-                annotated_pdf_url = annotated_upload_result.get('public_url')
-                log.info("✅ Annotated PDF upload successful. Public URL: %s", annotated_pdf_url)
-
-                # Call external API to update with verified_copy
-                log.info("Calling external API with verified_copy...")
-                try:
-                    verified_copy_payload = {
-                        "uid": str(uid),
-                        "data": {
-                            "verified_copy": annotated_pdf_url
-                        }
-                    }
-
-                    verified_copy_response = requests.put(
-                        EXTERNAL_API_URL,
-                        json=verified_copy_payload,
-                        headers={'Content-Type': 'application/json'},
-                        timeout=30,
-                        verify=False
-                    )
-
-                    if verified_copy_response.status_code == 200:
-                        log.info("✅ External API call successful for verified_copy")
-                        verified_copy_api_success = True
-                    else:
-                        log.warning("⚠️ External API call for verified_copy failed with status: %d", verified_copy_response.status_code)
-                except Exception as e:
-                    log.warning("⚠️ External API call for verified_copy failed: %s", str(e))
-            else:
-                log.warning("⚠️ Upload annotated PDF to DO Spaces failed: %s", annotated_upload_result.get('message'))
+            log.info("Uploading annotated PDF to DO Spaces (in background): %s", annotated_destination_path)
+            verified_copy_future = _EXECUTOR.submit(
+                _upload_verified_copy, annotated_pdf_path, annotated_destination_path, uid, log
+            )
         else:
             log.warning("⚠️ Annotated PDF not available for upload")
 
@@ -872,9 +1172,18 @@ def run_full_pipeline(
             uid=uid,
             evaluation=evaluation,
             log=log,
-            output_dir=output_dir  # Save debug payload for testing
+            output_dir=output_dir  # Debug payload is saved here when DEEP_EVAL_DEBUG_PAYLOAD=1
         )
 
+        # The process API should see the verified_copy update too, so finish STEP 3b first
+        if verified_copy_future is not None:
+            try:
+                annotated_pdf_url, verified_copy_api_success = verified_copy_future.result()
+            except SoftTimeLimitExceeded:
+                raise
+            except Exception as e:
+                log.warning("⚠️ Annotated PDF upload / verified_copy update failed: %s", str(e))
+
         process_api_success = False
         process_api_message = None
 
@@ -886,30 +1195,37 @@ def run_full_pipeline(
             log.info("STEP 4b: Triggering Process API")
             log.info("=" * 60)
 
-            process_api_success, process_api_message = trigger_process_api(log)
-
-            if process_api_success:
-                log.info("✅ Process API triggered successfully")
+            if process_api_trigger is not None:
+                # Queued: the caller doesn't wait for (or retry) the call itself
+                process_api_trigger()
+                process_api_success, process_api_message = None, "Queued"
+                log.info("Process API trigger queued")
             else:
-                log.warning("⚠️ Process API trigger failed: %s", process_api_message)
+                process_api_success, process_api_message = trigger_process_api(log)
+
+                if process_api_success:
+                    log.info("✅ Process API triggered successfully")
+                else:
+                    log.warning("⚠️ Process API trigger failed: %s", process_api_message)
         else:
             log.warning("⚠️ External API update failed for uid: %s - %s", uid, external_api_message)
 
         update_progress(100, "completed")
 
-        log.info("=" * 60)
-        log.info("✅ PIPELINE COMPLETE!")
-        log.info("=" * 60)
-        log.info("   OCR Output:      %s", ocr_output_path)
-        log.info("   Evaluation:      %s", evaluation_output_path)
-        if annotated_pdf_path:
-            log.info("   Annotated PDF:   %s", annotated_pdf_path)
-        if annotated_pdf_url:
-            log.info("   Annotated URL:   %s", annotated_pdf_url)
-        log.info("   Verified Copy:   %s", "Success" if verified_copy_api_success else "Failed")
-        log.info("   External API:    %s", "Success" if external_api_success else f"Failed - {external_api_message}")
-        log.info("   Process API:     %s", "Success" if process_api_success else f"Failed - {process_api_message}" if external_api_success else "Skipped")
-        log.info("   New Summary Page Added at Start: %s", is_new_summary_page_added_at_start)
+        if log.isEnabledFor(logging.INFO):
+            _log_pipeline_summary(
+                log,
+                ocr_output_path=ocr_output_path,
+                evaluation_output_path=evaluation_output_path,
+                annotated_pdf_path=annotated_pdf_path,
+                annotated_pdf_url=annotated_pdf_url,
+                verified_copy_api_success=verified_copy_api_success,
+                external_api_success=external_api_success,
+                external_api_message=external_api_message,
+                process_api_success=process_api_success,
+                process_api_message=process_api_message,
+                is_new_summary_page_added_at_start=is_new_summary_page_added_at_start,
+            )
 
         return {
             'status': 'completed',
@@ -927,13 +1243,15 @@ def run_full_pipeline(
             'is_new_summary_page_added_at_start': is_new_summary_page_added_at_start,
         }
 
+    except SoftTimeLimitExceeded:
+        raise
     except Exception as e:
         log.error("❌ Pipeline failed: %s", str(e))
         return {
             'status': 'failed',
             'error': str(e),
-            'ocr_output_path': ocr_output_path if os.path.exists(ocr_output_path) else None,
-            'evaluation_output_path': evaluation_output_path if os.path.exists(evaluation_output_path) else None,
+            'ocr_output_path': ocr_output_path if ocr_output_path in written_outputs else None,
+            'evaluation_output_path': evaluation_output_path if evaluation_output_path in written_outputs else None,
             'annotated_pdf_path': None,
             'external_api_success': False,
             'is_new_summary_page_added_at_start': is_new_summary_page_added_at_start,
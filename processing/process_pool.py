@@ -0,0 +1,145 @@
+"""
+Shared process pool for CPU-bound PDF work.
+
+PyMuPDF rendering and compression hold the GIL, so running them in worker
+processes lets several documents use several cores at once. The pool is
+created lazily on first use and shared by all callers in the process.
+
+The pool only helps outside Celery workers, e.g. the Flask app's synchronous
+/api/process upload path or scripts. Celery prefork children are daemonic and
+cannot start processes of their own, and under a gevent worker the executor's
+blocking pipe reads would stall every greenlet. So in the production task
+pipeline page rendering, compression and blank-page insertion run inline
+(serially, within one task), and parallelism comes from the Celery worker
+concurrency instead. Work also runs inline if the pool breaks.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Number of worker processes (default: CPU count)
+PROCESS_POOL_WORKERS = int(os.environ.get('PROCESS_POOL_WORKERS', '0')) or os.cpu_count() or 1
+
+_pool = None
+_pool_disabled = False
+_pool_lock = threading.Lock()
+
+
+def _gevent_patched() -> bool:
+    """Whether gevent has monkey-patched this process (gevent worker pool)."""
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched('threading')
+
+
+def get_process_pool():
+    """
+    Return the shared ProcessPoolExecutor, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor, or None if worker processes cannot be used here
+    """
+    global _pool, _pool_disabled
+
+    if _pool is not None or _pool_disabled:
+        return _pool
+
+    with _pool_lock:
+        if _pool is not None or _pool_disabled:
+            return _pool
+
+        if multiprocessing.current_process().daemon:
+            logger.info("[process_pool] Running in a daemonic process; CPU-bound work will run inline")
+            _pool_disabled = True
+            return None
+
+        if _gevent_patched():
+            logger.info("[process_pool] gevent monkey-patching is active; CPU-bound work will run inline")
+            _pool_disabled = True
+            return None
+
+        try:
+            _pool = ProcessPoolExecutor(max_workers=PROCESS_POOL_WORKERS)
+            logger.info("[process_pool] Started process pool with %d workers", PROCESS_POOL_WORKERS)
+        except Exception as e:
+            logger.warning("[process_pool] Could not start process pool: %s. Running inline.", e)
+            _pool_disabled = True
+
+    return _pool
+
+
+def _disable_pool(error):
+    """Shut down a broken pool so later calls run inline."""
+    global _pool, _pool_disabled
+
+    with _pool_lock:
+        logger.warning("[process_pool] Process pool unavailable (%s); falling back to inline execution", error)
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+        _pool_disabled = True
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Submit fn to the shared pool.
+
+    Args:
+        fn: Module-level (picklable) callable
+        *args, **kwargs: Arguments for fn
+
+    Returns:
+        Future for the call, or None if the pool is unavailable (caller runs inline)
+    """
+    pool = get_process_pool()
+    if pool is None:
+        return None
+
+    try:
+        return pool.submit(fn, *args, **kwargs)
+    except Exception as e:
+        _disable_pool(e)
+        return None
+
+
+def run_in_process(fn, *args, **kwargs):
+    """
+    Run fn in the shared pool and wait for the result, or inline if the pool is unavailable.
+
+    Args:
+        fn: Module-level (picklable) callable
+        *args, **kwargs: Arguments for fn
+
+    Returns:
+        Return value of fn
+    """
+    future = submit(fn, *args, **kwargs)
+    if future is None:
+        return fn(*args, **kwargs)
+
+    try:
+        return future.result()
+    except Exception as e:
+        # BrokenProcessPool / pickling errors: retry inline so the caller still gets a result
+        from concurrent.futures.process import BrokenProcessPool
+        if isinstance(e, BrokenProcessPool):
+            _disable_pool(e)
+            return fn(*args, **kwargs)
+        raise
+
+
+def shutdown_process_pool():
+    """Shut down the shared pool (e.g. on worker shutdown)."""
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
@@ -0,0 +1,36 @@
+"""
+TLS verification settings shared by every HTTP client in the pipeline.
+
+Certificates are verified by default, against the OS trust store when the
+optional truststore package is installed (so Docker images use the system
+CA bundle instead of a possibly stale certifi copy). SSL_VERIFY=0 turns
+verification off again for environments that still have certificate issues.
+"""
+
+import os
+import logging
+
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+# Verify server certificates (requests, urllib3 and boto3 clients)
+SSL_VERIFY = os.environ.get('SSL_VERIFY', '1').lower() not in ('0', 'false', 'no')
+
+
+def _use_system_trust_store():
+    """Make the ssl module verify against the OS trust store, if truststore is installed."""
+    try:
+        import truststore
+    except ImportError:
+        return
+
+    truststore.inject_into_ssl()
+    logger.info("[tls] Verifying certificates against the system trust store")
+
+
+if SSL_VERIFY:
+    _use_system_trust_store()
+else:
+    # Verification was turned off on purpose; don't warn on every request
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
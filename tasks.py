@@ -9,8 +9,11 @@ This module runs the document processing pipeline:
 """
 import os
 import shutil
+import uuid
+import redis
 import requests
-import urllib3
+from celery.exceptions import SoftTimeLimitExceeded
+from celery.signals import worker_process_init, worker_process_shutdown, worker_ready
 from celery_app import celery
 from config import (
     VERTEX_AI_API_KEY,
@@ -19,12 +22,16 @@ from config import (
     VERTEX_MODEL_NAME,
     OPENAI_API_KEY,
     OPENAI_ASSISTANT_ID,
+    REDIS_URL,
+    TASK_MAX_DELIVERIES,
 )
-from processing.pipeline import run_full_pipeline
-from logger import get_task_logger
+from processing import pipeline
+from processing.document_processor import create_retry_session
+from processing.download_cache import download_file
+from processing.pipeline import run_full_pipeline, trigger_process_api
+from processing.tls import SSL_VERIFY
+from logger import get_task_logger, shutdown_logging
 
-# Suppress SSL verification warnings (we use verify=False for DO Spaces compatibility)
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # Base directory for all task processing
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -33,10 +40,86 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TMP_DIR = os.path.join(BASE_DIR, 'tmp')
 os.makedirs(TMP_DIR, exist_ok=True)
 
+# Task directories are moved here (one rename) before they are deleted
+TRASH_DIR = os.path.join(TMP_DIR, '.trash')
+
 # Directory for final output files (annotated PDFs)
 OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Download cache (PDF_DOWNLOAD_CACHE=1); under TMP_DIR so entries can be hard-linked into task directories
+DOWNLOAD_CACHE_DIR = os.path.join(TMP_DIR, '.download-cache')
+
+# Per-task delivery counters (see _count_delivery); kept as long as task results
+DELIVERY_COUNT_KEY = 'deep_eval:deliveries:{}'
+DELIVERY_COUNT_TTL = 86400
+
+# Connects lazily; redis-py opens new connections after a fork
+REDIS_CLIENT = redis.from_url(REDIS_URL)
+
+
+def _create_download_session() -> requests.Session:
+    """Keep-alive session for PDF downloads, with retries on transient gateway errors."""
+    session = create_retry_session(
+        retries=3,
+        backoff_factor=0.3,
+        status_forcelist=(502, 503, 504),
+        pool_connections=4,
+        pool_maxsize=32,
+    )
+    session.verify = SSL_VERIFY
+    return session
+
+
+# Replaced in every prefork child (see below) so each process has its own pool
+SESSION = _create_download_session()
+
+
+@worker_process_init.connect
+def init_worker_http_sessions(**kwargs):
+    """Give each worker process fresh HTTP connection pools instead of sockets inherited over fork."""
+    global SESSION
+    SESSION = _create_download_session()
+    pipeline.reset_http_session()
+
+
+@worker_process_shutdown.connect
+def flush_worker_logs(**kwargs):
+    """Pool children exit without running atexit hooks, so write out queued log records here."""
+    shutdown_logging()
+
+
+def _make_task_dir(task_dir: str):
+    """Create a task directory with a single mkdir; TMP_DIR is only recreated if it has gone missing."""
+    try:
+        os.mkdir(task_dir)
+    except FileExistsError:
+        pass
+    except FileNotFoundError:
+        os.makedirs(task_dir, exist_ok=True)
+
+
+def _count_delivery(task_id: str, log) -> int:
+    """
+    Record one more delivery of task_id and return how many there have been.
+
+    A redelivered task keeps its id, so the counter tells a first run from a run
+    after a worker died mid-task.
+
+    Returns:
+        Delivery count, or 0 if Redis could not be reached (the task then runs as normal)
+    """
+    key = DELIVERY_COUNT_KEY.format(task_id)
+    try:
+        pipe = REDIS_CLIENT.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, DELIVERY_COUNT_TTL)
+        count, _ = pipe.execute()
+        return count
+    except redis.RedisError as e:
+        log.warning("Could not record task delivery: %s", e)
+        return 0
+
 
 def download_pdf(url: str, task_dir: str, task_id: str) -> str:
     """
@@ -53,17 +136,8 @@ def download_pdf(url: str, task_dir: str, task_id: str) -> str:
     filename = f"{task_id}_input.pdf"
     filepath = os.path.join(task_dir, filename)
 
-    # Download the file
-    # Note: verify=False disables SSL verification - used as workaround for
-    # certificate issues in Docker containers with DigitalOcean Spaces
-    response = requests.get(url, stream=True, timeout=120, verify=False)
-    response.raise_for_status()
-
-    # Save to disk
-    with open(filepath, 'wb') as f:
-        for chunk in response.iter_content(chunk_size=8192):
-            f.write(chunk)
-
+    # Download the file (shared keep-alive session)
+    download_file(url, filepath, DOWNLOAD_CACHE_DIR, session=SESSION, timeout=120)
     return filepath
 
 
@@ -81,12 +155,46 @@ def cleanup_task_dir(task_dir: str, keep_files: list = None):
                 # File is already in output dir, no action needed
                 pass
 
-    # Remove the entire task temp directory
-    if os.path.exists(task_dir):
-        shutil.rmtree(task_dir)
+    # Move the task temp directory aside (one rename on the same filesystem), then
+    # delete it; anything left behind by a killed worker is purged at worker start
+    trash_path = os.path.join(TRASH_DIR, f"{os.path.basename(task_dir)}-{uuid.uuid4().hex}")
+    try:
+        os.makedirs(TRASH_DIR, exist_ok=True)
+        os.rename(task_dir, trash_path)
+    except FileNotFoundError:
+        return
+    except OSError:
+        shutil.rmtree(task_dir, ignore_errors=True)
+        return
+
+    shutil.rmtree(trash_path, ignore_errors=True)
+
 
+@worker_ready.connect
+def purge_trash(**kwargs):
+    """Delete task directories whose cleanup was cut short (e.g. by a killed worker)."""
+    shutil.rmtree(TRASH_DIR, ignore_errors=True)
 
-@celery.task(bind=True, name='tasks.process_data')
+
+@celery.task(bind=True, name='tasks.trigger_process_api', autoretry_for=(requests.RequestException,),
+             retry_backoff=True, max_retries=5)
+def trigger_process_api_task(self) -> dict:
+    """
+    Call the external process API (queued by process_data_task once the evaluation is stored).
+
+    Failures are raised as RequestException so Celery retries with exponential backoff.
+
+    Returns:
+        dict with status
+    """
+    log = get_task_logger(self.request.id)
+    success, message = trigger_process_api(log)
+    if not success:
+        raise requests.RequestException(message)
+    return {'status': 'completed', 'task_id': self.request.id}
+
+
+@celery.task(bind=True, name='tasks.process_data', acks_late=True, reject_on_worker_lost=True)
 def process_data_task(self, data: dict) -> dict:
     """
     Process student PDF through the document evaluation pipeline.
@@ -115,9 +223,60 @@ def process_data_task(self, data: dict) -> dict:
     log = get_task_logger(task_id)
     log.info("Task started")
 
+    # ===========================================
+    # STEP 1: Validate Input
+    # (before touching the filesystem, so rejected requests cost nothing)
+    # ===========================================
+    pdf_url = data.get('student_uploaded_pdf_url')
+    if not pdf_url:
+        log.error("Missing required field: student_uploaded_pdf_url")
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': 'Missing required field: student_uploaded_pdf_url'
+        }
+
+    uid = data.get('uid')
+    if not uid:
+        log.error("Missing required field: uid")
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': 'Missing required field: uid'
+        }
+
+    # Validate API keys are configured
+    if not VERTEX_AI_API_KEY:
+        log.error("VERTEX_AI_API_KEY not configured")
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': 'VERTEX_AI_API_KEY not configured'
+        }
+    if not OPENAI_API_KEY or not OPENAI_ASSISTANT_ID:
+        log.error("OPENAI_API_KEY or OPENAI_ASSISTANT_ID not configured")
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': 'OPENAI_API_KEY or OPENAI_ASSISTANT_ID not configured'
+        }
+
+    # Late acks redeliver a task whose worker died; stop a task that keeps killing workers
+    deliveries = _count_delivery(task_id, log)
+    if deliveries > TASK_MAX_DELIVERIES:
+        log.error("Task delivered %d times (limit %d), not running it again", deliveries, TASK_MAX_DELIVERIES)
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': f'Task was redelivered {deliveries - 1} times after worker failures; giving up'
+        }
+    if deliveries > 1:
+        log.warning("Redelivered task (delivery %d of at most %d); earlier side effects will be repeated",
+                    deliveries, TASK_MAX_DELIVERIES)
+
     # Create task-specific temp directory for intermediate files
     task_dir = os.path.join(TMP_DIR, task_id)
-    os.makedirs(task_dir, exist_ok=True)
+    _make_task_dir(task_dir)
 
     def update_progress(progress: int, step: str):
         self.update_state(state='PROCESSING', meta={'progress': progress, 'step': step})
@@ -126,43 +285,6 @@ def process_data_task(self, data: dict) -> dict:
     update_progress(0, 'starting')
 
     try:
-        # ===========================================
-        # STEP 1: Validate Input
-        # ===========================================
-        pdf_url = data.get('student_uploaded_pdf_url')
-        if not pdf_url:
-            log.error("Missing required field: student_uploaded_pdf_url")
-            return {
-                'status': 'failed',
-                'task_id': task_id,
-                'error': 'Missing required field: student_uploaded_pdf_url'
-            }
-
-        uid = data.get('uid')
-        if not uid:
-            log.error("Missing required field: uid")
-            return {
-                'status': 'failed',
-                'task_id': task_id,
-                'error': 'Missing required field: uid'
-            }
-
-        # Validate API keys are configured
-        if not VERTEX_AI_API_KEY:
-            log.error("VERTEX_AI_API_KEY not configured")
-            return {
-                'status': 'failed',
-                'task_id': task_id,
-                'error': 'VERTEX_AI_API_KEY not configured'
-            }
-        if not OPENAI_API_KEY or not OPENAI_ASSISTANT_ID:
-            log.error("OPENAI_API_KEY or OPENAI_ASSISTANT_ID not configured")
-            return {
-                'status': 'failed',
-                'task_id': task_id,
-                'error': 'OPENAI_API_KEY or OPENAI_ASSISTANT_ID not configured'
-            }
-
         log.info("Processing for uid: %s", uid)
 
         # Get optional model_answer_url
@@ -197,6 +319,7 @@ def process_data_task(self, data: dict) -> dict:
             openai_assistant_id=OPENAI_ASSISTANT_ID,
             progress_callback=update_progress,
             model_answer_url=model_answer_url,
+            process_api_trigger=trigger_process_api_task.delay,
         )
 
         # ===========================================
@@ -232,6 +355,14 @@ def process_data_task(self, data: dict) -> dict:
                 'error': result.get('error', 'Unknown error in pipeline'),
             }
 
+    except SoftTimeLimitExceeded:
+        log.error("Task exceeded its soft time limit; cleaning up")
+        cleanup_task_dir(task_dir)
+        return {
+            'status': 'failed',
+            'task_id': task_id,
+            'error': 'Task exceeded its time limit'
+        }
     except requests.RequestException as e:
         log.error("Failed to download PDF: %s", str(e))
         cleanup_task_dir(task_dir)